@@ -8,15 +8,9 @@ import sys
 import argparse
 import logging
 from whatsapp_profile_changer.profile_changer import ProfileChanger
+from whatsapp_profile_changer.logging_setup import setup_logging
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 logger = logging.getLogger(__name__)
 
 def parse_arguments():
@@ -33,8 +27,8 @@ def parse_arguments():
     
     parser.add_argument(
         '-m', '--mode',
-        help='Mode: "sequence" or "clock"',
-        choices=['sequence', 'clock'],
+        help='Mode: "sequence", "playlist", "remote", "text" or "clock"',
+        choices=['sequence', 'playlist', 'remote', 'text', 'clock'],
         default=None
     )
     
@@ -51,6 +45,91 @@ def parse_arguments():
         default=None
     )
     
+    parser.add_argument(
+        '--playlist',
+        help='Playlist file for playlist mode',
+        default=None
+    )
+    
+    parser.add_argument(
+        '--shuffle',
+        help='Play the playlist in weighted random order without repeats',
+        action='store_true'
+    )
+    
+    parser.add_argument(
+        '--remote-url',
+        help='URL of the image manifest for remote mode',
+        default=None
+    )
+    
+    parser.add_argument(
+        '--cards',
+        help='Text file with the quotes or messages to render for text mode',
+        default=None
+    )
+    
+    parser.add_argument(
+        '--render-cache',
+        help='Render cache folder shared by all sessions on this host, e.g. /dev/shm/whatsapp_renders',
+        default=None
+    )
+    
+    parser.add_argument(
+        '-b', '--browser-profile',
+        help='Browser profile: "default" or "lean" (headless, low CPU/RAM)',
+        choices=['default', 'lean'],
+        default=None
+    )
+    
+    parser.add_argument(
+        '--strategy',
+        help='Browser execution strategy: "webdriver" or "script" (one injected script per flow stage)',
+        choices=['webdriver', 'script'],
+        default=None
+    )
+    
+    parser.add_argument(
+        '--control-port',
+        help='Port for the local control API (0 disables it)',
+        type=int,
+        default=None
+    )
+    
+    parser.add_argument(
+        '--profile',
+        help='Profile every N-th cycle of the main loop with cProfile',
+        type=int,
+        metavar='N',
+        default=None
+    )
+    
+    parser.add_argument(
+        '--profile-dir',
+        help='Folder for the per-cycle .prof files',
+        default=None
+    )
+    
+    parser.add_argument(
+        '--profile-memory',
+        help='Also take tracemalloc snapshots and diff them between profiled cycles',
+        action='store_true'
+    )
+    
+    parser.add_argument(
+        '--log-format',
+        help='Log format: "text" or "json" (one JSON object per line)',
+        choices=['text', 'json'],
+        default='text'
+    )
+    
+    parser.add_argument(
+        '--log-rate-limit',
+        help='Seconds during which repeated warnings and errors are limited (0 disables it)',
+        type=float,
+        default=60
+    )
+    
     return parser.parse_args()
 
 def main():
@@ -59,6 +138,9 @@ def main():
         # Parse command line arguments
         args = parse_arguments()
         
+        # Log through a queue with one background writer
+        setup_logging(json_format=args.log_format == 'json', rate_limit=args.log_rate_limit)
+        
         # Create profile changer
         changer = ProfileChanger(config_file=args.config)
         
@@ -75,9 +157,53 @@ def main():
             changer.pics_folder = args.pics_folder
             logger.info(f"Overriding pics folder from command line: {args.pics_folder}")
         
+        if args.playlist:
+            changer.playlist_file = args.playlist
+            logger.info(f"Overriding playlist file from command line: {args.playlist}")
+        
+        if args.shuffle:
+            changer.shuffle = True
+            logger.info("Enabling shuffle from command line")
+        
+        if args.remote_url:
+            changer.remote_url = args.remote_url
+            logger.info(f"Overriding remote URL from command line: {args.remote_url}")
+        
+        if args.cards:
+            changer.cards_file = args.cards
+            logger.info(f"Overriding cards file from command line: {args.cards}")
+        
+        if args.browser_profile:
+            changer.browser_profile = args.browser_profile
+            logger.info(f"Overriding browser profile from command line: {args.browser_profile}")
+        
+        if args.render_cache:
+            changer.render_cache_dir = args.render_cache
+            logger.info(f"Overriding render cache folder from command line: {args.render_cache}")
+        
+        if args.strategy:
+            changer.browser_strategy = args.strategy
+            logger.info(f"Overriding browser strategy from command line: {args.strategy}")
+        
+        if args.control_port is not None:
+            changer.control_port = args.control_port
+            logger.info(f"Overriding control port from command line: {args.control_port}")
+        
+        if args.profile is not None:
+            changer.profile_every = args.profile
+            logger.info(f"Overriding profiling interval from command line: {args.profile}")
+        
+        if args.profile_dir:
+            changer.profile_dir = args.profile_dir
+            logger.info(f"Overriding profile folder from command line: {args.profile_dir}")
+        
+        if args.profile_memory:
+            changer.profile_memory = True
+            logger.info("Enabling memory profiling from command line")
+        
         # Run the profile changer
         changer.run()
-        
+    
     except KeyboardInterrupt:
         logger.info("Process interrupted by user.")
     except Exception as e:
@@ -18,6 +18,9 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/ronaldlanton/whatsapp-profile-changer",
     packages=find_packages(),
+    package_data={
+        "whatsapp_profile_changer": ["fixtures/*.html"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,292 @@
+"""
+Benchmark module for WhatsApp Profile Changer.
+
+Micro-benchmarks for the image side: rendering clock images at several sizes,
+indexing picture folders of 100 up to 100,000 files (a million on request),
+and normalizing photos to the avatar size. Results can be saved as a baseline, and later runs fail
+when a benchmark got slower than the baseline by more than a threshold, so
+rendering and indexing changes can be judged on numbers.
+
+Usage:
+    python -m whatsapp_profile_changer.benchmark --save-baseline
+    python -m whatsapp_profile_changer.benchmark [--threshold 0.25]
+
+Timings depend on the machine, so compare against a baseline saved on the
+same one.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import statistics
+import logging
+import platform
+import argparse
+import tempfile
+import PIL
+from PIL import Image
+from .logging_setup import setup_logging
+from .image_handler import ImageHandler
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+CLOCK_SIZES = (128, 256, 640, 1024)
+# A million files takes minutes to create, so that size only runs when asked for
+FILE_COUNTS = (100, 1000, 10000, 100000)
+NORMALIZE_SIZE = 640
+PHOTO_SIZE = (4000, 3000)
+DEFAULT_BASELINE = "benchmark_baseline.json"
+# Slowdowns within this many times the spread between runs are noise, not regressions
+JITTER_FACTOR = 2
+
+def time_call(func, min_time=0.5, max_repeat=50):
+    """
+    Time a function, repeating it until enough time has passed.
+    
+    Args:
+        func (callable): Function to time.
+        min_time (float): Keep repeating until this many seconds were spent.
+        max_repeat (int): Most repetitions to run.
+    
+    Returns:
+        tuple: Fastest run in seconds, the least disturbed by the rest of the system,
+            and the spread between the fastest run and the fastest quarter of runs.
+    """
+    times = []
+    start = time.perf_counter()
+    while len(times) < max_repeat and (not times or time.perf_counter() - start < min_time):
+        run_start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - run_start)
+    fastest = min(times)
+    if len(times) < 2:
+        return fastest, 0.0
+    return fastest, statistics.quantiles(times, n=4)[0] - fastest
+
+def make_file_folder(folder, count):
+    """Create a folder of empty, numbered picture files."""
+    os.makedirs(folder, exist_ok=True)
+    for index in range(1, count + 1):
+        os.close(os.open(os.path.join(folder, f"{index}.png"), os.O_CREAT | os.O_WRONLY, 0o644))
+
+def make_photo(path):
+    """Create a camera-sized JPEG with some detail in it, so it doesn't compress to nothing."""
+    gradient = Image.linear_gradient('L').resize(PHOTO_SIZE)
+    noise = Image.effect_noise(PHOTO_SIZE, 40)
+    Image.merge('RGB', (gradient, noise, gradient.transpose(Image.FLIP_LEFT_RIGHT))).save(path, quality=90)
+
+def build_cases(work_dir, groups, file_counts=FILE_COUNTS, clock_sizes=CLOCK_SIZES):
+    """
+    Set up the benchmarks.
+    
+    Args:
+        work_dir (str): Folder for the synthetic picture folders and outputs.
+        groups (list): Benchmark groups to run: "clock", "files" and/or "normalize".
+        file_counts (iterable): Folder sizes for the indexing benchmark.
+        clock_sizes (iterable): Image sizes for the clock benchmark.
+    
+    Returns:
+        list: (name, function, time_call options) tuples.
+    """
+    cases = []
+    temp_folder = os.path.join(work_dir, "temp")
+    pics_folder = os.path.join(work_dir, "pics")
+    os.makedirs(pics_folder, exist_ok=True)
+    handler = ImageHandler(pics_folder=pics_folder, temp_folder=temp_folder)
+    
+    if "clock" in groups:
+        for size in clock_sizes:
+            cases.append((f"clock_{size}", lambda size=size: handler.create_clock_image(size=size), {}))
+    
+    if "files" in groups:
+        for count in file_counts:
+            folder = os.path.join(work_dir, f"files_{count}")
+            if not os.path.isdir(folder):
+                logger.info(f"Creating {count} files for the indexing benchmark...")
+                make_file_folder(folder, count)
+            indexer = ImageHandler(pics_folder=folder, temp_folder=temp_folder)
+            # Small folders take well under a millisecond, so they need many runs for a stable minimum
+            options = {'max_repeat': 5} if count > 10000 else {'min_time': 1.0, 'max_repeat': 200}
+            cases.append((f"sorted_files_{count}", indexer.get_sorted_image_files, options))
+    
+    if "normalize" in groups:
+        photo = os.path.join(work_dir, "photo.jpg")
+        if not os.path.exists(photo):
+            make_photo(photo)
+        cases.append((
+            f"normalize_{NORMALIZE_SIZE}",
+            lambda: handler.normalize_image(photo, size=NORMALIZE_SIZE),
+            {'min_time': 1.0}
+        ))
+    
+    return cases
+
+def run_cases(cases):
+    """
+    Time benchmark cases.
+    
+    Args:
+        cases (list): Cases from build_cases.
+    
+    Returns:
+        tuple: Seconds per operation and run-to-run spread in seconds, both by benchmark name.
+    """
+    # The image handler logs every call, which would only add noise here
+    handler_logger = logging.getLogger(ImageHandler.__module__)
+    level = handler_logger.level
+    handler_logger.setLevel(logging.WARNING)
+    try:
+        results, jitter = {}, {}
+        for name, func, options in cases:
+            results[name], jitter[name] = time_call(func, **options)
+            logger.info(f"{name}: {results[name] * 1000:.2f} ms (±{jitter[name] * 1000:.2f})")
+        return results, jitter
+    finally:
+        handler_logger.setLevel(level)
+
+def environment():
+    """Describe the machine, so a baseline from another one can be spotted."""
+    return {
+        'python': platform.python_version(),
+        'pillow': PIL.__version__,
+        'machine': platform.machine(),
+        'node': platform.node(),
+    }
+
+def load_baseline(path):
+    """
+    Load a saved baseline.
+    
+    Args:
+        path (str): Path to the baseline file.
+    
+    Returns:
+        dict: The baseline, or None if there is none.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_baseline(path, results, jitter):
+    """
+    Save results as the new baseline, keeping entries of benchmarks that weren't run.
+    
+    Args:
+        path (str): Path to the baseline file.
+        results (dict): Seconds per operation by benchmark name.
+        jitter (dict): Run-to-run spread in seconds by benchmark name.
+    """
+    baseline = load_baseline(path) or {}
+    merged = dict(baseline.get('results', {}))
+    merged.update(results)
+    merged_jitter = dict(baseline.get('jitter', {}))
+    merged_jitter.update(jitter)
+    
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'saved_at': time.time(), 'environment': environment(), 'results': merged,
+                   'jitter': merged_jitter}, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+def compare(results, jitter, baseline, threshold, jitter_factor=JITTER_FACTOR):
+    """
+    Compare results with a baseline.
+    
+    A benchmark regressed when it is slower by more than the threshold and by more
+    than jitter_factor times the larger run-to-run spread of the two measurements,
+    so the margin scales with how noisy each benchmark is rather than being fixed.
+    
+    Args:
+        results (dict): Seconds per operation by benchmark name.
+        jitter (dict): Run-to-run spread in seconds by benchmark name.
+        baseline (dict): Saved baseline.
+        threshold (float): Allowed slowdown, e.g. 0.25 for 25%.
+        jitter_factor (float): Slowdowns within this many spreads never count as regressions.
+    
+    Returns:
+        list: (name, baseline seconds, current seconds, ratio, regressed) tuples.
+    """
+    rows = []
+    for name, seconds in results.items():
+        before = baseline.get('results', {}).get(name)
+        if before is None:
+            rows.append((name, None, seconds, None, False))
+            continue
+        ratio = seconds / before
+        # Baselines saved before the spread was recorded only have the current one
+        spread = max(jitter.get(name, 0), baseline.get('jitter', {}).get(name, 0))
+        rows.append((name, before, seconds, ratio, ratio > 1 + threshold and seconds - before > jitter_factor * spread))
+    return rows
+
+def main(argv=None):
+    """Run the benchmarks, then save them as the baseline or check them against it."""
+    parser = argparse.ArgumentParser(
+        description='Benchmark clock rendering, folder indexing and image normalization.'
+    )
+    parser.add_argument('--only', nargs='+', choices=['clock', 'files', 'normalize'],
+                        default=['clock', 'files', 'normalize'], help='Benchmark groups to run')
+    parser.add_argument('--file-counts', nargs='+', type=int, default=list(FILE_COUNTS),
+                        help='Folder sizes for the indexing benchmark (add 1000000 for the largest)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline file')
+    parser.add_argument('--save-baseline', action='store_true', help='Save the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Fail when a benchmark is slower than the baseline by more than this fraction')
+    parser.add_argument('--jitter-factor', type=float, default=JITTER_FACTOR,
+                        help='Ignore slowdowns within this many times the spread between runs')
+    parser.add_argument('--confirm', type=int, default=2,
+                        help='Times to re-run a benchmark that looks regressed before failing')
+    parser.add_argument('--work-dir', default=None,
+                        help='Keep the synthetic folders here between runs instead of a temporary folder')
+    args = parser.parse_args(argv)
+    
+    baseline = load_baseline(args.baseline)
+    if not baseline and not args.save_baseline:
+        logger.warning(f"No baseline at {args.baseline}. Run with --save-baseline to create one.")
+    elif baseline and baseline.get('environment') != environment():
+        logger.warning("The baseline was saved on a different machine or setup, so timings may not compare.")
+    baseline = baseline or {}
+    
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="benchmark_")
+    try:
+        cases = build_cases(work_dir, args.only, file_counts=args.file_counts)
+        results, jitter = run_cases(cases)
+        
+        # A single slow run is often just a busy machine, so time suspects again
+        for _ in range(args.confirm):
+            suspects = {row[0] for row in compare(results, jitter, baseline, args.threshold, args.jitter_factor) if row[4]}
+            if not suspects or args.save_baseline:
+                break
+            logger.info(f"Re-running {len(suspects)} benchmarks that look regressed")
+            rerun, rerun_jitter = run_cases([case for case in cases if case[0] in suspects])
+            for name, seconds in rerun.items():
+                if seconds < results[name]:
+                    results[name], jitter[name] = seconds, rerun_jitter[name]
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    if args.save_baseline:
+        save_baseline(args.baseline, results, jitter)
+        logger.info(f"Saved baseline to {args.baseline}")
+        baseline = load_baseline(args.baseline)
+    
+    rows = compare(results, jitter, baseline, args.threshold, args.jitter_factor)
+    print(f"{'benchmark':<22} {'baseline (ms)':>14} {'current (ms)':>13} {'change':>8}")
+    for name, before, seconds, ratio, regressed in rows:
+        before_text = f"{before * 1000:.2f}" if before is not None else "-"
+        change = f"{(ratio - 1) * 100:+.1f}%" if ratio is not None else "-"
+        print(f"{name:<22} {before_text:>14} {seconds * 1000:>13.2f} {change:>8}{'  REGRESSION' if regressed else ''}")
+    
+    regressions = [row for row in rows if row[4]]
+    if regressions:
+        logger.error(f"{len(regressions)} benchmarks regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    setup_logging()
+    sys.exit(main())
\ No newline at end of file
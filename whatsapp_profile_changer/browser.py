@@ -2,38 +2,251 @@
 Browser module for WhatsApp Profile Changer.
 """
 
+import os
 import time
 import logging
 from selenium import webdriver
 from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from .jobs import TEXT_FIELDS
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+WHATSAPP_WEB_URL = "https://web.whatsapp.com/"
+
+# WhatsApp Web replaces the login QR code every 20 seconds or so, so a headless
+# login keeps refreshing its screenshot until the chat list appears.
+QR_SELECTOR = "canvas"
+QR_REFRESH_SECONDS = 5
+
+# Browser profiles: "default" is the visible, full-featured browser, "lean" is a
+# headless browser trimmed down to what the avatar flow actually needs.
+BROWSER_PROFILES = ("default", "lean")
+
+# Requests blocked in the lean profile. Chat media (pictures, stickers, voice
+# notes, videos) is served from mmg.whatsapp.net; profile pictures come from
+# pps.whatsapp.net and are left alone.
+LEAN_BLOCKED_URLS = [
+    "*://mmg.whatsapp.net/*",
+    "*://media*.whatsapp.net/*",
+    "*.mp4",
+    "*.webm",
+    "*.ogg",
+    "*.opus",
+    "*.mp3",
+    "*.m4a",
+]
+
+# Execution strategies: "webdriver" drives every wait and click through
+# chromedriver, "script" runs each stage of the flow as one injected script.
+BROWSER_STRATEGIES = ("webdriver", "script")
+
+# Selectors of the profile flow
+PROFILE_SELECTOR = "img.x1n2onr6.x1lliihq.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x14yjl9h.xudhj91.x18nykt9.xww2gxu.xl1xv1r.x115dhu7.x17vty23.x1hc1fzr._ao3e"
+INTERMEDIATE_SELECTOR = "div.x10l6tqk.x13vifvy.x17qophe.x1vjfegm.xh8yej3.x5yr21d"
+EDIT_SELECTOR = "div.x10l6tqk.x13vifvy.x17qophe.xfo81ep.x9f619.x78zum5.xdt5ytf.x6s0dn4.xl56j7k.xh8yej3.x5yr21d.x1nxh6w3.x1u7k74.x1j16vfr.xtvhhri.x146q241.x14yjl9h.xudhj91.x18nykt9.xww2gxu.xqy66fx"
+PENCIL_SELECTOR = "span[data-icon='pencil']"
+UPLOAD_XPATHS = [
+    "//li[@value='0'][@role='button'][contains(text(), 'Upload photo')]",
+    "//li[contains(@class, '_aj-r')][contains(text(), 'Upload photo')]",
+    "//div[contains(text(), 'Upload photo')]",
+    "//span[contains(text(), 'Upload photo')]"
+]
+FILE_INPUT_SELECTOR = "input[type='file']"
+SAVE_SELECTOR = "div.x78zum5.x6s0dn4.xl56j7k.xexx8yu.x4uap5.x18d9i69.xkhd6sd.x1f6kntn.xk50ysn.x7o08j2.xtvhhri.x1rluvsa.x14yjl9h.xudhj91.x18nykt9.xww2gxu.xu306ak.x12s1jxh.xkdsq27.xwwtwea.x1gfkgh9.x1247r65.xng8ra[role='button']"
+
+# Runs a list of steps inside the page and reports back through the async
+# script callback. Each step waits for its element by polling, then acts on it:
+#   {"css": selector, "index": n} or {"xpath": [alternatives]} picks the element,
+#   "action" is "click", "find" (return the element), "type" (replace the text
+#   of the focused editor and press Enter, needs no element) or "escape",
+#   "timeout" is in ms and "pause" is the time in ms to wait after the action.
+FLOW_SCRIPT = """
+var steps = arguments[0], done = arguments[arguments.length - 1];
+function visible(el) { return el && el.getClientRects().length > 0 && !el.disabled; }
+function locate(step) {
+    if (step.action === "type") {
+        // Like WebDriver mode, type into whatever has focus once it is editable
+        var focused = document.activeElement;
+        return focused && (focused.isContentEditable || /^(INPUT|TEXTAREA)$/.test(focused.tagName)) ? focused : null;
+    }
+    if (step.css) {
+        var all = document.querySelectorAll(step.css);
+        var el = all[step.index || 0];
+        return step.action === "find" || visible(el) ? el : null;
+    }
+    for (var i = 0; i < step.xpath.length; i++) {
+        var el = document.evaluate(step.xpath[i], document, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        if (el) { return el; }
+    }
+    return null;
+}
+function escape() {
+    var target = document.activeElement || document.body;
+    target.dispatchEvent(new KeyboardEvent("keydown",
+        {key: "Escape", code: "Escape", keyCode: 27, which: 27, bubbles: true}));
+}
+function run(i, found) {
+    if (i >= steps.length) { done({ok: true, element: found || null}); return; }
+    var step = steps[i], deadline = Date.now() + (step.timeout || 3000);
+    if (step.action === "escape") { escape(); setTimeout(function () { run(i + 1, found); }, step.pause || 0); return; }
+    (function poll() {
+        var el = locate(step);
+        if (!el) {
+            if (Date.now() > deadline) { done({ok: false, step: i, error: "Timed out waiting for " + (step.css || (step.xpath ? step.xpath[0] : "a focused editor"))}); return; }
+            setTimeout(poll, 50);
+            return;
+        }
+        try {
+            if (step.action === "click") {
+                el.click();
+            } else if (step.action === "type") {
+                document.execCommand("selectAll", false, null);
+                document.execCommand("insertText", false, step.text);
+                el.dispatchEvent(new KeyboardEvent("keydown",
+                    {key: "Enter", code: "Enter", keyCode: 13, which: 13, bubbles: true}));
+            }
+        } catch (e) { done({ok: false, step: i, error: String(e)}); return; }
+        setTimeout(function () { run(i + 1, el); }, step.pause || 0);
+    })();
+}
+run(0, null);
+"""
+
 class Browser:
     """Browser handler for WhatsApp Web automation."""
     
-    def __init__(self):
-        """Initialize the browser handler."""
+    def __init__(self, profile="default", url=WHATSAPP_WEB_URL, user_data_dir=None, strategy="webdriver"):
+        """
+        Initialize the browser handler.
+        
+        Args:
+            profile (str): Browser profile, either "default" or "lean".
+            url (str): Page to open, WhatsApp Web unless a local fixture is used.
+            user_data_dir (str, optional): Chrome user data directory. Keeps the
+                                           WhatsApp session so a headless browser
+                                           does not need a new QR scan.
+            strategy (str): Execution strategy, either "webdriver" or "script".
+        """
+        if profile not in BROWSER_PROFILES:
+            raise ValueError(f"Unknown browser profile '{profile}'. Expected one of: {', '.join(BROWSER_PROFILES)}")
+        if strategy not in BROWSER_STRATEGIES:
+            raise ValueError(f"Unknown browser strategy '{strategy}'. Expected one of: {', '.join(BROWSER_STRATEGIES)}")
+        
         self.driver = None
+        self.armed_input = None
+        self.saved_at = None
+        self.profile = profile
+        self.url = url
+        self.user_data_dir = user_data_dir
+        self.strategy = strategy
+        self.round_trips = 0
     
-    def setup(self):
-        """Set up the browser instance."""
-        logger.info("Setting up the browser...")
+    def _build_options(self):
+        """
+        Build the Chrome options for the selected profile.
+        
+        Returns:
+            ChromeOptions: Options to launch Chrome with.
+        """
         options = webdriver.ChromeOptions()
         # Add options to make browser more stable for automation
         options.add_argument("--disable-notifications")
-        options.add_argument("--start-maximized")
         options.add_argument("--disable-infobars")
         options.add_argument("--disable-extensions")
         
-        self.driver = webdriver.Chrome(options=options)
-        self.driver.get("https://web.whatsapp.com/")
+        if self.user_data_dir:
+            options.add_argument(f"--user-data-dir={os.path.abspath(self.user_data_dir)}")
+        
+        if self.profile == "lean":
+            # Headless with a small fixed viewport, no GPU and no audio/video pipeline
+            options.add_argument("--headless=new")
+            options.add_argument("--window-size=800,600")
+            options.add_argument("--disable-gpu")
+            options.add_argument("--mute-audio")
+            options.add_argument("--autoplay-policy=user-gesture-required")
+            options.add_argument("--disable-accelerated-video-decode")
+            options.add_argument("--disable-background-networking")
+            options.add_argument("--disable-component-update")
+            options.add_argument("--disable-default-apps")
+            options.add_argument("--disable-sync")
+            options.add_argument("--renderer-process-limit=1")
+        else:
+            options.add_argument("--start-maximized")
+        
+        return options
+    
+    def _create_driver(self, options):
+        """
+        Create the WebDriver instance.
+        
+        Args:
+            options (ChromeOptions): Options to launch Chrome with.
+            
+        Returns:
+            WebDriver: The started driver.
+        """
+        return webdriver.Chrome(options=options)
+    
+    def _apply_lean_network_settings(self):
+        """Block media loads and hide the headless user agent."""
+        try:
+            user_agent = self.driver.execute_script("return navigator.userAgent")
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            # WhatsApp Web refuses browsers that announce themselves as headless
+            self.driver.execute_cdp_cmd(
+                "Network.setUserAgentOverride",
+                {"userAgent": user_agent.replace("HeadlessChrome", "Chrome")}
+            )
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+        except Exception as e:
+            logger.warning(f"Could not apply lean network settings: {str(e)}")
+    
+    def setup(self):
+        """Set up the browser instance."""
+        logger.info(f"Setting up the browser ({self.profile} profile)...")
+        options = self._build_options()
+        
+        self.driver = self._create_driver(options)
+        self._count_round_trips()
+        if self.strategy == "script":
+            # In-page waits add up to several seconds per stage
+            self.driver.set_script_timeout(30)
+        if self.profile == "lean":
+            self._apply_lean_network_settings()
+        self.driver.get(self.url)
         logger.info("WhatsApp Web opened. Please scan the QR code.")
     
+    def _count_round_trips(self):
+        """Count every command sent to chromedriver in `round_trips`."""
+        execute = getattr(self.driver, 'execute', None)
+        if execute is None:
+            return
+        
+        def counted_execute(*args, **kwargs):
+            self.round_trips += 1
+            return execute(*args, **kwargs)
+        
+        # Elements send their commands through the driver's execute as well
+        self.driver.execute = counted_execute
+    
+    def _run_steps(self, steps):
+        """
+        Run flow steps inside the page in a single round trip.
+        
+        Args:
+            steps (list): Steps as described at FLOW_SCRIPT.
+            
+        Returns:
+            dict: {"ok": True, "element": last element} or {"ok": False, "step": index, "error": message}.
+        """
+        return self.driver.execute_async_script(FLOW_SCRIPT, steps)
+    
     def wait_for_login(self, timeout=300):
         """
         Wait for user to scan the QR code and log in.
@@ -45,6 +258,9 @@ class Browser:
             bool: True if login successful, False otherwise.
         """
         logger.info(f"Waiting for QR code scan. You have {timeout} seconds to authenticate.")
+        if self.profile == "lean":
+            # There is no window to scan from, so keep a screenshot of the current QR code
+            return self._wait_for_login_headless(timeout)
         try:
             # Wait for the main chat list to appear which indicates successful login
             WebDriverWait(self.driver, timeout).until(
@@ -56,53 +272,170 @@ class Browser:
             logger.error(f"Login timeout after {timeout} seconds. QR code was not scanned.")
             return False
     
-    def open_profile_pane(self):
+    def _wait_for_login_headless(self, timeout, path="login_qr.png"):
         """
-        Open the profile pane.
+        Wait for login, refreshing the QR code screenshot until the chat list appears.
         
+        Args:
+            timeout (int): Timeout in seconds to wait for login.
+            path (str): Where to write the screenshot.
+            
         Returns:
-            bool: True if profile pane opened successfully, False otherwise.
+            bool: True if login successful, False otherwise.
         """
-        logger.info("Opening profile pane...")
-        try:
-            # 1. Click profile picture using exact tracked selector
-            profile_selector = "img.x1n2onr6.x1lliihq.xh8yej3.x5yr21d.x6ikm8r.x10wlt62.x14yjl9h.xudhj91.x18nykt9.xww2gxu.xl1xv1r.x115dhu7.x17vty23.x1hc1fzr._ao3e"
-            
+        deadline = time.monotonic() + timeout
+        next_capture = 0
+        announced = False
+        while time.monotonic() < deadline:
             try:
-                profile_pic = WebDriverWait(self.driver, 5).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, profile_selector))
-                )
-                profile_pic.click()
-                logger.info("Clicked profile picture")
-                time.sleep(0.5)
-
-                # 2. Click the intermediate div
-                intermediate_selector = "div.x10l6tqk.x13vifvy.x17qophe.x1vjfegm.xh8yej3.x5yr21d"
-                intermediate_button = WebDriverWait(self.driver, 3).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, intermediate_selector))
-                )
-                intermediate_button.click()
-                logger.info("Clicked intermediate button")
-                time.sleep(0.5)
-
-                # 3. Click edit area
-                edit_selector = "div.x10l6tqk.x13vifvy.x17qophe.xfo81ep.x9f619.x78zum5.xdt5ytf.x6s0dn4.xl56j7k.xh8yej3.x5yr21d.x1nxh6w3.x1u7k74.x1j16vfr.xtvhhri.x146q241.x14yjl9h.xudhj91.x18nykt9.xww2gxu.xqy66fx"
-                edit_button = WebDriverWait(self.driver, 3).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, edit_selector))
-                )
-                edit_button.click()
-                logger.info("Clicked edit area")
-                time.sleep(0.5)
-                return True
-
+                if self.driver.find_elements(By.ID, "side"):
+                    logger.info("Successfully logged in to WhatsApp Web.")
+                    return True
+                if time.monotonic() >= next_capture and self.save_login_screenshot(path):
+                    next_capture = time.monotonic() + QR_REFRESH_SECONDS
+                    if not announced:
+                        logger.info(f"Running headless. Scan the QR code saved at {os.path.abspath(path)}. "
+                                    f"It is refreshed every {QR_REFRESH_SECONDS} seconds.")
+                        announced = True
             except Exception as e:
-                logger.error(f"Error clicking elements: {str(e)}")
+                logger.warning(f"Error while waiting for login: {str(e)}")
+            time.sleep(1)
+        
+        logger.error(f"Login timeout after {timeout} seconds. QR code was not scanned.")
+        return False
+    
+    def save_login_screenshot(self, path="login_qr.png"):
+        """
+        Save a screenshot of the login page once the QR code has rendered.
+        
+        Args:
+            path (str): Where to write the screenshot.
+            
+        Returns:
+            bool: True if a screenshot was saved, False if there is no QR code yet.
+        """
+        try:
+            if not self.driver.find_elements(By.CSS_SELECTOR, QR_SELECTOR):
                 return False
-
+            # Write it next to the old one and swap, so a half-written file is never scanned
+            temp_path = path + ".tmp.png"
+            self.driver.save_screenshot(temp_path)
+            os.replace(temp_path, path)
+            return True
+        except Exception as e:
+            logger.warning(f"Could not save login screenshot: {str(e)}")
+            return False
+    
+    def open_profile_drawer(self):
+        """
+        Open the profile drawer, where the photo, name and about can be edited.
+        
+        Returns:
+            bool: True if the drawer opened successfully, False otherwise.
+        """
+        try:
+            if self.strategy == "script":
+                result = self._run_steps([{"css": PROFILE_SELECTOR, "action": "click", "timeout": 5000}])
+                if not result["ok"]:
+                    raise TimeoutException(result["error"])
+                logger.info("Clicked profile picture")
+                return True
+            
+            # 1. Click profile picture using exact tracked selector
+            profile_pic = WebDriverWait(self.driver, 5).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, PROFILE_SELECTOR))
+            )
+            profile_pic.click()
+            logger.info("Clicked profile picture")
+            time.sleep(0.5)
+            return True
+        
         except Exception as e:
             logger.error(f"Error opening profile pane: {str(e)}")
             return False
     
+    def open_photo_menu(self):
+        """
+        Open the photo menu from the profile drawer.
+        
+        Returns:
+            bool: True if the photo menu opened successfully, False otherwise.
+        """
+        try:
+            if self.strategy == "script":
+                result = self._run_steps([
+                    {"css": INTERMEDIATE_SELECTOR, "action": "click", "pause": 500},
+                    {"css": EDIT_SELECTOR, "action": "click", "pause": 500},
+                ])
+                if not result["ok"]:
+                    raise TimeoutException(result["error"])
+                logger.info("Clicked intermediate button and edit area")
+                return True
+            
+            # 2. Click the intermediate div
+            intermediate_button = WebDriverWait(self.driver, 3).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, INTERMEDIATE_SELECTOR))
+            )
+            intermediate_button.click()
+            logger.info("Clicked intermediate button")
+            time.sleep(0.5)
+            
+            # 3. Click edit area
+            edit_button = WebDriverWait(self.driver, 3).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, EDIT_SELECTOR))
+            )
+            edit_button.click()
+            logger.info("Clicked edit area")
+            time.sleep(0.5)
+            return True
+        
+        except Exception as e:
+            logger.error(f"Error clicking elements: {str(e)}")
+            return False
+    
+    def update_text_field(self, field, text):
+        """
+        Change the name or about text in the open profile drawer.
+        
+        Args:
+            field (str): Either "name" or "about".
+            text (str): The new text.
+            
+        Returns:
+            bool: True if the text was saved, False otherwise.
+        """
+        try:
+            # The drawer has one pencil button per text field: name first, then about
+            index = TEXT_FIELDS.index(field)
+            if self.strategy == "script":
+                result = self._run_steps([
+                    {"css": PENCIL_SELECTOR, "index": index, "action": "click"},
+                    {"action": "type", "text": text, "pause": 300},
+                ])
+                if not result["ok"]:
+                    raise TimeoutException(result["error"])
+                logger.info(f"Updated {field}: {text}")
+                return True
+            
+            pencils = WebDriverWait(self.driver, 3).until(
+                lambda driver: driver.find_elements(By.CSS_SELECTOR, PENCIL_SELECTOR)[index:]
+            )
+            pencils[0].click()
+            
+            # Clicking the pencil focuses the editable text
+            editor = self.driver.switch_to.active_element
+            editor.send_keys(Keys.CONTROL, "a")
+            editor.send_keys(Keys.BACKSPACE)
+            editor.send_keys(text)
+            editor.send_keys(Keys.ENTER)
+            logger.info(f"Updated {field}: {text}")
+            time.sleep(0.5)
+            return True
+        
+        except Exception as e:
+            logger.error(f"Error updating {field}: {str(e)}")
+            return False
+    
     def check_for_upload_option(self):
         """
         Check if the upload photo option is visible.
@@ -111,14 +444,10 @@ class Browser:
             bool: True if upload option is visible, False otherwise.
         """
         try:
-            upload_selectors = [
-                "//li[@value='0'][@role='button'][contains(text(), 'Upload photo')]",
-                "//li[contains(@class, '_aj-r')][contains(text(), 'Upload photo')]",
-                "//div[contains(text(), 'Upload photo')]",
-                "//span[contains(text(), 'Upload photo')]"
-            ]
-            
-            for selector in upload_selectors:
+            if self.strategy == "script":
+                return self._run_steps([{"xpath": UPLOAD_XPATHS, "action": "find", "timeout": 2000}])["ok"]
+            
+            for selector in UPLOAD_XPATHS:
                 try:
                     WebDriverWait(self.driver, 2).until(
                         EC.presence_of_element_located((By.XPATH, selector))
@@ -142,22 +471,29 @@ class Browser:
             bool: True if upload successful, False otherwise.
         """
         try:
-            # Find and use the file input
-            file_input = self.driver.find_element(By.CSS_SELECTOR, "input[type='file']")
+            # Use the file input found while arming, or find it now
+            file_input = self.armed_input or self.driver.find_element(By.CSS_SELECTOR, FILE_INPUT_SELECTOR)
+            self.armed_input = None
             file_input.send_keys(image_path)
             logger.info(f"Uploaded image: {image_path}")
             
-            # Wait for image to be processed
-            time.sleep(2)
-
-            # Click the save button using the specific class selector
-            save_selector = "div.x78zum5.x6s0dn4.xl56j7k.xexx8yu.x4uap5.x18d9i69.xkhd6sd.x1f6kntn.xk50ysn.x7o08j2.xtvhhri.x1rluvsa.x14yjl9h.xudhj91.x18nykt9.xww2gxu.xu306ak.x12s1jxh.xkdsq27.xwwtwea.x1gfkgh9.x1247r65.xng8ra[role='button']"
+            if self.strategy == "script":
+                # The save button is waited for inside the page, so there is no fixed sleep
+                result = self._run_steps([{"css": SAVE_SELECTOR, "action": "click", "timeout": 7000}])
+                if not result["ok"]:
+                    logger.error(f"Error clicking save button: {result['error']}")
+                    return False
+                self.saved_at = time.monotonic()
+                logger.info("Clicked save button")
+                return True
             
+            # Click the save button as soon as the image is processed and it becomes clickable
             try:
-                save_button = WebDriverWait(self.driver, 5).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, save_selector))
+                save_button = WebDriverWait(self.driver, 7).until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, SAVE_SELECTOR))
                 )
                 save_button.click()
+                self.saved_at = time.monotonic()
                 logger.info("Clicked save button")
                 time.sleep(1)
                 return True
@@ -170,8 +506,84 @@ class Browser:
             logger.error(f"Error uploading profile picture: {str(e)}")
             return False
     
+    def arm_upload(self):
+        """
+        Navigate to the file input of the photo menu and keep it ready.
+        
+        The profile drawer must already be open. Once armed, an upload only has
+        to send the file and click save.
+        
+        Returns:
+            bool: True if the upload is armed, False otherwise.
+        """
+        if self.strategy == "script":
+            # Menu clicks, the upload option check and the file input in one round trip
+            try:
+                result = self._run_steps([
+                    {"css": INTERMEDIATE_SELECTOR, "action": "click"},
+                    {"css": EDIT_SELECTOR, "action": "click"},
+                    {"xpath": UPLOAD_XPATHS, "action": "find", "timeout": 2000},
+                    {"css": FILE_INPUT_SELECTOR, "action": "find"},
+                ])
+            except Exception as e:
+                logger.error(f"Error arming upload: {str(e)}")
+                return False
+            if not result["ok"]:
+                logger.error(f"Error arming upload: {result['error']}")
+                return False
+            self.armed_input = result["element"]
+            return True
+        
+        if not self.open_photo_menu() or not self.check_for_upload_option():
+            return False
+        
+        try:
+            self.armed_input = self.driver.find_element(By.CSS_SELECTOR, FILE_INPUT_SELECTOR)
+            return True
+        except Exception as e:
+            logger.error(f"Error finding file input: {str(e)}")
+            return False
+    
+    def cancel_upload(self):
+        """Close the photo menu and profile drawer without uploading."""
+        self.armed_input = None
+        try:
+            if self.strategy == "script":
+                self._run_steps([{"action": "escape", "pause": 300}, {"action": "escape", "pause": 300}])
+                logger.debug("Cancelled armed upload")
+                return
+            
+            body = self.driver.find_element(By.TAG_NAME, "body")
+            # One escape closes the photo menu, the next one the drawer
+            for _ in range(2):
+                body.send_keys(Keys.ESCAPE)
+                time.sleep(0.3)
+            logger.debug("Cancelled armed upload")
+        except Exception as e:
+            logger.error(f"Error cancelling upload: {str(e)}")
+    
+    def health(self):
+        """
+        Check whether the browser session can still be used.
+        
+        Returns:
+            str: "ok", "logged_out" if WhatsApp Web is showing the login page,
+                 or "dead" if the driver no longer responds.
+        """
+        try:
+            if self.driver.find_elements(By.ID, "side"):
+                return "ok"
+            return "logged_out"
+        except Exception:
+            return "dead"
+    
     def cleanup(self):
         """Clean up browser resources."""
         if self.driver:
-            self.driver.quit()
-            logger.info("Browser closed")
\ No newline at end of file
+            try:
+                self.driver.quit()
+                logger.info("Browser closed")
+            except Exception as e:
+                logger.error(f"Error closing browser: {str(e)}")
+            self.driver = None
+            self.armed_input = None
\ No newline at end of file
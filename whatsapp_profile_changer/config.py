@@ -7,7 +7,6 @@ import configparser
 import logging
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class Config:
@@ -29,6 +28,31 @@ class Config:
         self.mode = "sequence"
         self.timeout = 300
         self.temp_folder = "temp_clock"
+        self.browser_profile = "default"
+        self.user_data_dir = None
+        self.browser_strategy = "webdriver"
+        self.state_file = "state.journal"
+        self.control_port = 0
+        self.control_socket = None
+        self.profile_every = 0
+        self.profile_dir = "profiles"
+        self.profile_memory = False
+        self.about_file = None
+        self.name_file = None
+        self.prearm = True
+        self.max_armed_seconds = 10.0
+        self.playlist_file = None
+        self.shuffle = False
+        self.shuffle_seed = 0
+        self.remote_url = None
+        self.remote_cache = "remote_cache"
+        self.prefetch = 3
+        self.cards_file = None
+        self.cards_folder = "cards"
+        self.font_file = None
+        self.card_workers = 0
+        self.render_cache_dir = None
+        self.normalize_size = 0
         
         # Try to load configuration from file
         if config_file is None:
@@ -68,6 +92,31 @@ class Config:
                 self.mode = settings.get('mode', self.mode)
                 self.timeout = settings.getint('timeout', self.timeout)
                 self.temp_folder = settings.get('temp_folder', self.temp_folder)
+                self.browser_profile = settings.get('browser_profile', self.browser_profile)
+                self.user_data_dir = settings.get('user_data_dir', self.user_data_dir) or None
+                self.browser_strategy = settings.get('browser_strategy', self.browser_strategy)
+                self.state_file = settings.get('state_file', self.state_file)
+                self.control_port = settings.getint('control_port', self.control_port)
+                self.control_socket = settings.get('control_socket', self.control_socket) or None
+                self.profile_every = settings.getint('profile_every', self.profile_every)
+                self.profile_dir = settings.get('profile_dir', self.profile_dir)
+                self.profile_memory = settings.getboolean('profile_memory', self.profile_memory)
+                self.about_file = settings.get('about_file', self.about_file) or None
+                self.name_file = settings.get('name_file', self.name_file) or None
+                self.prearm = settings.getboolean('prearm', self.prearm)
+                self.max_armed_seconds = settings.getfloat('max_armed_seconds', self.max_armed_seconds)
+                self.playlist_file = settings.get('playlist_file', self.playlist_file) or None
+                self.shuffle = settings.getboolean('shuffle', self.shuffle)
+                self.shuffle_seed = settings.getint('shuffle_seed', self.shuffle_seed)
+                self.remote_url = settings.get('remote_url', self.remote_url) or None
+                self.remote_cache = settings.get('remote_cache', self.remote_cache)
+                self.prefetch = settings.getint('prefetch', self.prefetch)
+                self.cards_file = settings.get('cards_file', self.cards_file) or None
+                self.cards_folder = settings.get('cards_folder', self.cards_folder)
+                self.font_file = settings.get('font_file', self.font_file) or None
+                self.card_workers = settings.getint('card_workers', self.card_workers)
+                self.render_cache_dir = settings.get('render_cache_dir', self.render_cache_dir) or None
+                self.normalize_size = settings.getint('normalize_size', self.normalize_size)
                 
         except Exception as e:
             logger.error(f"Error loading configuration: {str(e)}")
@@ -85,5 +134,30 @@ class Config:
             'duration': self.duration,
             'mode': self.mode,
             'timeout': self.timeout,
-            'temp_folder': self.temp_folder
+            'temp_folder': self.temp_folder,
+            'browser_profile': self.browser_profile,
+            'user_data_dir': self.user_data_dir,
+            'browser_strategy': self.browser_strategy,
+            'state_file': self.state_file,
+            'control_port': self.control_port,
+            'control_socket': self.control_socket,
+            'profile_every': self.profile_every,
+            'profile_dir': self.profile_dir,
+            'profile_memory': self.profile_memory,
+            'about_file': self.about_file,
+            'name_file': self.name_file,
+            'prearm': self.prearm,
+            'max_armed_seconds': self.max_armed_seconds,
+            'playlist_file': self.playlist_file,
+            'shuffle': self.shuffle,
+            'shuffle_seed': self.shuffle_seed,
+            'remote_url': self.remote_url,
+            'remote_cache': self.remote_cache,
+            'prefetch': self.prefetch,
+            'cards_file': self.cards_file,
+            'cards_folder': self.cards_folder,
+            'font_file': self.font_file,
+            'card_workers': self.card_workers,
+            'render_cache_dir': self.render_cache_dir,
+            'normalize_size': self.normalize_size
         }
\ No newline at end of file
@@ -0,0 +1,223 @@
+"""
+Control API module for WhatsApp Profile Changer.
+
+Serves a small HTTP API on localhost (or a Unix socket) so a running profile
+changer can be steered without restarting it:
+
+    GET  /status                          Current state of the run
+    POST /push    {"image": "/path.png"}  Change to an image right away, optionally
+                  "about" and "name" too
+    POST /pause                           Pause profile changes
+    POST /resume                          Resume profile changes
+    POST /mode    {"mode": "clock"}       Switch mode from the next change on
+
+Request bodies must be sent as application/json. Requests from web pages, which
+browsers mark with an Origin header, are refused, so a website the user visits
+can't reach the API on localhost.
+"""
+
+import os
+import json
+import asyncio
+import logging
+import threading
+from .jobs import UpdateJob
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+MODES = ("sequence", "playlist", "remote", "text", "clock")
+
+REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    415: "Unsupported Media Type",
+}
+
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "[::1]")
+
+class ControlServer:
+    """Local HTTP control API running in a background thread."""
+    
+    def __init__(self, changer, host="127.0.0.1", port=0, socket_path=None):
+        """
+        Initialize the control server.
+        
+        Args:
+            changer (ProfileChanger): The profile changer to control.
+            host (str): Address to listen on when serving over TCP.
+            port (int): TCP port to listen on.
+            socket_path (str, optional): Unix socket to listen on instead of TCP.
+        """
+        self.changer = changer
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self._started = threading.Event()
+    
+    def start(self):
+        """Start serving in a background thread."""
+        self.thread = threading.Thread(target=self._serve, name="control-api", daemon=True)
+        self.thread.start()
+        self._started.wait()
+    
+    def stop(self):
+        """Stop serving."""
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.thread:
+            self.thread.join(timeout=5)
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+    
+    def _serve(self):
+        """Run the event loop of the server thread."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            if self.socket_path:
+                if os.path.exists(self.socket_path):
+                    os.unlink(self.socket_path)
+                self.server = self.loop.run_until_complete(
+                    asyncio.start_unix_server(self._handle, path=self.socket_path)
+                )
+                logger.info(f"Control API listening on unix socket {self.socket_path}")
+            else:
+                self.server = self.loop.run_until_complete(
+                    asyncio.start_server(self._handle, self.host, self.port)
+                )
+                self.port = self.server.sockets[0].getsockname()[1]
+                logger.info(f"Control API listening on http://{self.host}:{self.port}")
+        except Exception as e:
+            logger.error(f"Error starting control API: {str(e)}")
+            self._started.set()
+            return
+        
+        self._started.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.server.close()
+            self.loop.run_until_complete(self.server.wait_closed())
+            self.loop.close()
+    
+    async def _handle(self, reader, writer):
+        """Handle one HTTP request."""
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if not line:
+                    break
+                key, _, value = line.partition(':')
+                headers[key.strip().lower()] = value.strip()
+            
+            body = b''
+            length = int(headers.get('content-length', 0))
+            if length:
+                body = await reader.readexactly(length)
+            
+            if len(request_line) < 2:
+                status, payload = 400, {'error': 'Malformed request'}
+            else:
+                status, payload = self.check_headers(headers, body)
+                if status is None:
+                    status, payload = self.dispatch(request_line[0].upper(), request_line[1], body)
+        except Exception as e:
+            status, payload = 400, {'error': str(e)}
+        
+        data = json.dumps(payload).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: close\r\n\r\n".encode('latin-1') + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+    
+    def check_headers(self, headers, body=b''):
+        """
+        Refuse requests that may come from a web page instead of a local client.
+        
+        Browsers can send simple cross-origin requests to localhost without asking
+        first, but they always add an Origin header and can't send JSON that way.
+        
+        Args:
+            headers (dict): Request headers with lowercase names.
+            body (bytes): Request body.
+        
+        Returns:
+            tuple: (None, None) if the request is allowed, otherwise (HTTP status code, response payload).
+        """
+        if 'origin' in headers:
+            return 403, {'error': 'Requests from web pages are not allowed'}
+        if not self.socket_path:
+            # A DNS rebinding page reaches us under its own host name
+            host = headers.get('host', '')
+            if host.startswith('['):
+                host = host.partition(']')[0] + ']'
+            else:
+                host = host.partition(':')[0]
+            if host and host not in LOCAL_HOSTS:
+                return 403, {'error': f"Host '{host}' is not allowed"}
+        if body and headers.get('content-type', '').split(';')[0].strip().lower() != 'application/json':
+            return 415, {'error': 'Send the body as application/json'}
+        return None, None
+    
+    def dispatch(self, method, path, body=b''):
+        """
+        Route a request to the profile changer.
+        
+        Commands are queued and applied by the main loop at its next safe point.
+        
+        Args:
+            method (str): HTTP method.
+            path (str): Request path.
+            body (bytes): Request body.
+        
+        Returns:
+            tuple: (HTTP status code, response payload).
+        """
+        path = path.split('?', 1)[0].rstrip('/')
+        
+        if path == '/status':
+            if method != 'GET':
+                return 405, {'error': 'Use GET'}
+            return 200, self.changer.get_status()
+        
+        if path not in ('/push', '/pause', '/resume', '/mode'):
+            return 404, {'error': f"Unknown endpoint '{path}'"}
+        if method != 'POST':
+            return 405, {'error': 'Use POST'}
+        
+        data = json.loads(body) if body else {}
+        
+        if path == '/push':
+            job = UpdateJob(photo=data.get('image'), about=data.get('about'), name=data.get('name'))
+            if not job.fields():
+                return 400, {'error': 'Nothing to change, give an image, about or name'}
+            if job.photo and not os.path.isfile(job.photo):
+                return 400, {'error': f"Image '{job.photo}' not found"}
+            self.changer.push_job(job)
+        elif path == '/pause':
+            self.changer.pause()
+        elif path == '/resume':
+            self.changer.resume()
+        elif path == '/mode':
+            mode = data.get('mode')
+            if mode not in MODES:
+                return 400, {'error': f"Mode must be one of: {', '.join(MODES)}"}
+            self.changer.set_mode(mode)
+        
+        return 202, {'accepted': path.lstrip('/')}
\ No newline at end of file
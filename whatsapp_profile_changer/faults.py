@@ -0,0 +1,544 @@
+"""
+Fault-injection harness for WhatsApp Profile Changer.
+
+Runs ProfileChanger.run against a fake WebDriver whose simulated WhatsApp Web
+page misbehaves on a schedule, and reports how long the service takes to
+recover from each kind of fault and how many changes per hour get through.
+
+Fault types:
+    delay           Elements show up late, sometimes after the waits give up
+    missing_upload  The "Upload photo" item is missing from the photo menu
+    stale_save      The save button goes stale when clicked
+    driver_killed   The driver dies and every call fails until it is restarted
+    logged_out      WhatsApp Web logs the session out until the QR code is scanned again
+
+Usage:
+    python -m whatsapp_profile_changer.faults [--faults delay stale_save ...] [--run-seconds 60]
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import tempfile
+import threading
+import statistics
+from PIL import Image
+from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    ElementNotInteractableException,
+    StaleElementReferenceException,
+    WebDriverException,
+)
+from .logging_setup import setup_logging
+from .browser import Browser
+from .profile_changer import ProfileChanger
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+FAULT_TYPES = ("delay", "missing_upload", "stale_save", "driver_killed", "logged_out")
+
+# DOM fixture: recognizable part of each selector used by browser.py, mapped to
+# the element of the simulated page it finds
+SELECTORS = [
+    ("side", "side"),
+    ("_ao3e", "avatar"),
+    ("x1vjfegm", "intermediate"),
+    ("xqy66fx", "edit"),
+    ("Upload photo", "upload"),
+    ("input[type='file']", "file"),
+    ("xng8ra", "save"),
+    ("pencil", "pencil"),
+    ("body", "body"),
+]
+
+class Fault:
+    """One scheduled fault."""
+    
+    def __init__(self, kind, start, duration):
+        """
+        Initialize the fault.
+        
+        Args:
+            kind (str): One of FAULT_TYPES.
+            start (float): Seconds after the run starts when the fault begins.
+            duration (float): Seconds the fault lasts.
+        """
+        if kind not in FAULT_TYPES:
+            raise ValueError(f"Unknown fault type '{kind}'. Expected one of: {', '.join(FAULT_TYPES)}")
+        self.kind = kind
+        self.start = start
+        self.duration = duration
+    
+    @property
+    def end(self):
+        """Seconds after the run starts when the fault clears."""
+        return self.start + self.duration
+
+class FaultInjector:
+    """Schedule of faults shared by every fake driver of one run."""
+    
+    def __init__(self, faults, seed=0, max_delay=8.0):
+        """
+        Initialize the fault injector.
+        
+        Args:
+            faults (list): Scheduled Fault objects.
+            seed (int): Seed for the random element delays.
+            max_delay (float): Longest delay in seconds for the delay fault.
+        """
+        self.faults = faults
+        self.random = random.Random(seed)
+        self.max_delay = max_delay
+        self.started = time.monotonic()
+        self.changes = []
+        self.lock = threading.Lock()
+    
+    def now(self):
+        """Seconds since the run started."""
+        return time.monotonic() - self.started
+    
+    def active(self, kind):
+        """
+        Check whether a fault of the given kind is active right now.
+        
+        Args:
+            kind (str): Fault type.
+        
+        Returns:
+            bool: True if the fault is active.
+        """
+        now = self.now()
+        return any(f.kind == kind and f.start <= now < f.end for f in self.faults)
+    
+    def killed_since(self, created):
+        """
+        Check whether a driver kill happened after a driver was created.
+        
+        Args:
+            created (float): Seconds after the run start when the driver was created.
+        
+        Returns:
+            bool: True if the driver has been killed.
+        """
+        now = self.now()
+        return any(f.kind == "driver_killed" and created < f.start <= now for f in self.faults)
+    
+    def reveal_delay(self):
+        """Delay in seconds before a newly shown element becomes visible."""
+        if self.active("delay"):
+            return self.random.uniform(0, self.max_delay)
+        return 0
+    
+    def record_change(self):
+        """Record a successful profile change."""
+        with self.lock:
+            self.changes.append(self.now())
+
+class FakeElement:
+    """Element of the simulated page."""
+    
+    def __init__(self, driver, name):
+        """
+        Initialize the fake element.
+        
+        Args:
+            driver (FakeDriver): Driver of the simulated page.
+            name (str): Element name, one of the names in SELECTORS or "editor".
+        """
+        self.driver = driver
+        self.name = name
+    
+    def is_displayed(self):
+        """Check whether the element is visible right now."""
+        self.driver.command()
+        return self.driver.visible(self.name)
+    
+    def is_enabled(self):
+        """Report the element as enabled, the simulated page never disables anything."""
+        self.driver.command()
+        return True
+    
+    def click(self):
+        """Click the element, failing like WebDriver when it isn't visible."""
+        self.driver.check_alive()
+        if not self.driver.visible(self.name):
+            raise ElementNotInteractableException(f"Element '{self.name}' is not visible")
+        self.driver.click(self)
+    
+    def send_keys(self, *values):
+        """Type text or send a file path to the element."""
+        self.driver.check_alive()
+        self.driver.type(self, "".join(values))
+
+class _SwitchTo:
+    """Minimal stand-in for WebDriver's switch_to."""
+    
+    def __init__(self, driver):
+        """Initialize with the driver of the simulated page."""
+        self.driver = driver
+    
+    @property
+    def active_element(self):
+        """The focused element, which is always the text editor of the drawer."""
+        self.driver.check_alive()
+        return FakeElement(self.driver, "editor")
+
+class _Process:
+    """Stand-in for the chromedriver process, pointing at this process."""
+    
+    def __init__(self):
+        """Use the pid of this process."""
+        self.pid = os.getpid()
+
+class _Service:
+    """Stand-in for the chromedriver service."""
+    
+    def __init__(self):
+        """Create the stand-in process."""
+        self.process = _Process()
+
+class FakeDriver:
+    """WebDriver stand-in simulating the parts of WhatsApp Web the changer uses."""
+    
+    def __init__(self, injector):
+        """
+        Initialize the fake driver.
+        
+        Args:
+            injector (FaultInjector): Faults to apply.
+        """
+        self.injector = injector
+        self.created = injector.now()
+        self.switch_to = _SwitchTo(self)
+        self.service = _Service()
+        self.layers = []
+        self.revealed = {}
+        self.on_command = None
+    
+    # Session state
+    
+    def command(self):
+        """Count one command, which would be a chromedriver round trip."""
+        if self.on_command:
+            self.on_command()
+    
+    def check_alive(self):
+        """Count a command and fail it when the driver has been killed."""
+        self.command()
+        if self.injector.killed_since(self.created):
+            raise WebDriverException("invalid session id: session deleted because of page crash")
+    
+    def logged_in(self):
+        """Check whether the session is logged in, clearing the page when it isn't."""
+        if self.injector.active("logged_out"):
+            # Logging out throws away whatever was open
+            self.layers = []
+            return False
+        return True
+    
+    def show(self, layer):
+        """Open a layer of the page, revealing it after the current element delay."""
+        if layer not in self.layers:
+            self.layers.append(layer)
+            self.revealed[layer] = time.monotonic() + self.injector.reveal_delay()
+    
+    def close_top(self):
+        """Close the topmost layer, like pressing Escape."""
+        if self.layers:
+            # Closing the photo menu also closes the photo overlay under it
+            if self.layers.pop() == "menu" and self.layers[-1:] == ["photo"]:
+                self.layers.pop()
+    
+    def visible(self, name):
+        """
+        Check whether an element is visible.
+        
+        Args:
+            name (str): Element name.
+        
+        Returns:
+            bool: True if the element is shown and revealed.
+        """
+        if not self.logged_in():
+            return name == "body"
+        
+        layer = {
+            "side": None,
+            "avatar": None,
+            "body": None,
+            "pencil": "drawer",
+            "intermediate": "drawer",
+            "edit": "photo",
+            "upload": "menu",
+            "file": "menu",
+            "save": "editor",
+            "editor": "drawer",
+        }[name]
+        if layer is None:
+            return True
+        if layer not in self.layers or time.monotonic() < self.revealed[layer]:
+            return False
+        if name == "upload" and self.injector.active("missing_upload"):
+            return False
+        return True
+    
+    # Interactions
+    
+    def click(self, element):
+        """Apply a click on an element to the page."""
+        name = element.name
+        if name == "avatar":
+            self.show("drawer")
+        elif name == "intermediate":
+            self.show("photo")
+        elif name == "edit":
+            self.show("menu")
+        elif name == "save":
+            if self.injector.active("stale_save"):
+                raise StaleElementReferenceException("stale element reference: element is not attached to the page document")
+            self.layers = []
+            self.injector.record_change()
+    
+    def type(self, element, text):
+        """Apply typed text or a sent file path to the page."""
+        if element.name == "file":
+            if "menu" not in self.layers:
+                raise ElementNotInteractableException("File input is not available")
+            self.show("editor")
+        elif element.name == "body" and Keys.ESCAPE in text:
+            for _ in range(text.count(Keys.ESCAPE)):
+                self.close_top()
+    
+    # WebDriver API
+    
+    def get(self, url):
+        """Load a page. The simulated page is always there."""
+        self.check_alive()
+    
+    def find_element(self, by, value):
+        """Find the first element matching a selector or raise NoSuchElementException."""
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"Unable to locate element: {value}")
+        return elements[0]
+    
+    def find_elements(self, by, value):
+        """Find the visible elements matching a selector."""
+        self.check_alive()
+        name = _element_name(value)
+        if not name or not self.visible(name):
+            return []
+        # The drawer has two pencils, one for the name and one for the about text
+        count = 2 if name == "pencil" else 1
+        return [FakeElement(self, name) for _ in range(count)]
+    
+    def execute_script(self, script, *args):
+        """Run a script. Only the user agent lookup of the lean profile is simulated."""
+        self.check_alive()
+        return "Mozilla/5.0 (X11; Linux x86_64) Chrome/120.0.0.0 Safari/537.36"
+    
+    def set_script_timeout(self, seconds):
+        """Set the async script timeout, which the simulated steps bring along themselves."""
+        self.check_alive()
+    
+    def execute_async_script(self, script, *args):
+        """
+        Run the steps of the script strategy against the simulated page.
+        
+        Like FLOW_SCRIPT in the browser, all steps cost a single round trip and
+        each one polls for its element until its timeout, under the same faults
+        as the WebDriver commands.
+        
+        Args:
+            script (str): The step runner script, not interpreted.
+            *args: The list of steps.
+        
+        Returns:
+            dict: {"ok": True, "element": last element} or {"ok": False, "step": index, "error": message}.
+        """
+        self.check_alive()
+        found = None
+        for index, step in enumerate(args[0]):
+            action = step.get("action")
+            if action == "escape":
+                self.close_top()
+            else:
+                if action == "type":
+                    name, target = "editor", "a focused editor"
+                else:
+                    target = step.get("css") or step["xpath"][0]
+                    name = _element_name(target)
+                deadline = time.monotonic() + step.get("timeout", 3000) / 1000
+                while not (name and self.visible(name)):
+                    if self.injector.killed_since(self.created):
+                        raise WebDriverException("invalid session id: session deleted because of page crash")
+                    if time.monotonic() > deadline:
+                        return {"ok": False, "step": index, "error": f"Timed out waiting for {target}"}
+                    time.sleep(0.05)
+                
+                element = FakeElement(self, name)
+                try:
+                    if action == "click":
+                        self.click(element)
+                    elif action == "type":
+                        self.type(element, step["text"])
+                except WebDriverException as e:
+                    return {"ok": False, "step": index, "error": str(e)}
+                found = element
+            time.sleep(step.get("pause", 0) / 1000)
+        return {"ok": True, "element": found}
+    
+    def execute_cdp_cmd(self, cmd, params):
+        """Run a DevTools command, accepted and ignored."""
+        self.check_alive()
+        return {}
+    
+    def save_screenshot(self, path):
+        """Take a screenshot, which the simulated page skips."""
+        self.check_alive()
+        return True
+    
+    def quit(self):
+        """Quit the driver. There is no browser to close."""
+        pass
+
+def _element_name(selector):
+    """
+    Map a selector used by browser.py to the element of the simulated page it finds.
+    
+    Args:
+        selector (str): CSS selector or XPath.
+    
+    Returns:
+        str: Element name, or None if the page has no such element.
+    """
+    for fragment, name in SELECTORS:
+        if fragment in selector:
+            return name
+    return None
+
+class FaultInjectingBrowser(Browser):
+    """Browser that drives a FakeDriver instead of Chrome."""
+    
+    injector = None
+    
+    def _create_driver(self, options):
+        """Create a fake driver under the fault schedule instead of starting Chrome."""
+        return FakeDriver(self.injector)
+    
+    def _count_round_trips(self):
+        """Count the commands of the fake driver as round trips."""
+        def count():
+            self.round_trips += 1
+        self.driver.on_command = count
+
+def _make_pictures(folder, count=3):
+    """Create a few pictures to cycle through."""
+    for index in range(1, count + 1):
+        Image.new('RGB', (64, 64), (index * 60, 80, 160)).save(os.path.join(folder, f"{index}.png"))
+
+def run_scenario(faults, run_seconds, duration=2, seed=0, strategy="webdriver"):
+    """
+    Run ProfileChanger.run under a fault schedule.
+    
+    Args:
+        faults (list): Scheduled Fault objects.
+        run_seconds (float): How long to run.
+        duration (int): Seconds each picture is shown.
+        seed (int): Seed for random element delays.
+        strategy (str): Browser execution strategy, "webdriver" or "script".
+    
+    Returns:
+        dict: Recovery times and throughput of the run.
+    """
+    injector = FaultInjector(faults, seed=seed)
+    browser_class = type("ScenarioBrowser", (FaultInjectingBrowser,), {"injector": injector})
+    changer_class = type("ScenarioChanger", (ProfileChanger,), {"browser_class": browser_class})
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pics_folder = os.path.join(temp_dir, "pics")
+        os.makedirs(pics_folder)
+        _make_pictures(pics_folder)
+        
+        changer = changer_class(config_file=os.devnull)
+        changer.mode = "sequence"
+        changer.duration = duration
+        changer.pics_folder = pics_folder
+        changer.temp_folder = os.path.join(temp_dir, "temp")
+        changer.state_file = None
+        changer.timeout = 60
+        changer.browser_strategy = strategy
+        
+        timer = threading.Timer(run_seconds, changer.stop)
+        timer.start()
+        try:
+            injector.started = time.monotonic()
+            changer.run()
+        finally:
+            timer.cancel()
+        elapsed = injector.now()
+    
+    recoveries = []
+    for fault in faults:
+        # Time from the fault clearing to the next change that went through
+        after = [t for t in injector.changes if t >= fault.end]
+        if after:
+            recoveries.append(after[0] - fault.end)
+    
+    return {
+        'faults': len(faults),
+        'recovered': len(recoveries),
+        'mttr': statistics.mean(recoveries) if recoveries else None,
+        'changes': len(injector.changes),
+        'changes_per_hour': len(injector.changes) / elapsed * 3600 if elapsed else 0,
+    }
+
+def main(argv=None):
+    """Run every fault type and print recovery times."""
+    parser = argparse.ArgumentParser(
+        description='Measure mean time to recovery and changes per hour under injected faults.'
+    )
+    parser.add_argument('--faults', nargs='+', choices=FAULT_TYPES, default=list(FAULT_TYPES),
+                        help='Fault types to run')
+    parser.add_argument('--run-seconds', type=float, default=60, help='Length of each scenario')
+    parser.add_argument('--fault-at', type=float, default=15, help='Seconds into the run when the fault starts')
+    parser.add_argument('--fault-seconds', type=float, default=10, help='How long each fault lasts')
+    parser.add_argument('--repeat-every', type=float, default=0,
+                        help='Inject the fault again every N seconds (0 injects it once)')
+    parser.add_argument('--duration', type=int, default=2, help='Seconds each picture is shown')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for random element delays')
+    parser.add_argument('--baseline', action='store_true', help='Also run a scenario without faults')
+    parser.add_argument('--strategy', choices=['webdriver', 'script'], default='webdriver',
+                        help='Browser execution strategy to run under the faults')
+    args = parser.parse_args(argv)
+    
+    scenarios = [('none', [])] if args.baseline else []
+    for kind in args.faults:
+        starts = [args.fault_at]
+        while args.repeat_every and starts[-1] + args.repeat_every < args.run_seconds:
+            starts.append(starts[-1] + args.repeat_every)
+        # A killed driver stays dead until restarted, so the fault itself has no length
+        fault_seconds = 0 if kind == "driver_killed" else args.fault_seconds
+        scenarios.append((kind, [Fault(kind, start, fault_seconds) for start in starts]))
+    
+    results = []
+    for kind, faults in scenarios:
+        logger.info(f"Running scenario '{kind}' for {args.run_seconds:.0f} seconds")
+        results.append((kind, run_scenario(faults, args.run_seconds, duration=args.duration, seed=args.seed,
+                                           strategy=args.strategy)))
+    
+    print(f"{'fault':<16} {'faults':>6} {'recovered':>9} {'mttr (s)':>9} {'changes':>8} {'changes/h':>10}")
+    for kind, result in results:
+        mttr = f"{result['mttr']:.2f}" if result['mttr'] is not None else "-"
+        print(f"{kind:<16} {result['faults']:>6} {result['recovered']:>9} {mttr:>9} "
+              f"{result['changes']:>8} {result['changes_per_hour']:>10.0f}")
+    return 0
+
+if __name__ == "__main__":
+    setup_logging()
+    sys.exit(main())
\ No newline at end of file
@@ -4,29 +4,269 @@ Image handler module for WhatsApp Profile Changer.
 
 import os
 import glob
+import time
+import hashlib
 import logging
 import math
+import functools
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import pytz
-from PIL import Image, ImageDraw
+from PIL import Image, ImageDraw, ImageFont, ImageColor, ImageOps
+from .render_cache import RenderCache
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Text card layout
+CARD_SIZE = 256
+CARD_PADDING = 20
+CARD_FONT_SIZES = range(48, 11, -2)
+CARD_LINE_SPACING = 1.2
+
+@functools.lru_cache(maxsize=64)
+def load_font(font_file, size):
+    """
+    Load a font, cached so each font and size is only read from disk once.
+    
+    Args:
+        font_file (str): Path to a TrueType font, or None for Pillow's default font.
+        size (int): Font size in pixels.
+    
+    Returns:
+        ImageFont: The font.
+    """
+    if font_file:
+        return ImageFont.truetype(font_file, size)
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        # Pillow before 10.1 has only a fixed-size bitmap default font
+        return ImageFont.load_default()
+
+@functools.lru_cache(maxsize=65536)
+def text_width(font_file, size, text):
+    """
+    Measure a run of text, cached so repeated words are only measured once.
+    
+    Args:
+        font_file (str): Path to a TrueType font, or None for the default font.
+        size (int): Font size in pixels.
+        text (str): Text to measure.
+    
+    Returns:
+        float: Width in pixels.
+    """
+    font = load_font(font_file, size)
+    try:
+        return font.getlength(text)
+    except AttributeError:
+        # The bitmap default font of Pillow before 9.2 only has getsize
+        return font.getsize(text)[0]
+
+@functools.lru_cache(maxsize=4096)
+def layout_text(text, font_file=None, card_size=CARD_SIZE):
+    """
+    Lay out text on a card, using the largest font size that fits.
+    
+    Args:
+        text (str): Text of the card. Line breaks are kept, and long lines are wrapped.
+        font_file (str, optional): Path to a TrueType font.
+        card_size (int): Width and height of the card in pixels.
+    
+    Returns:
+        tuple: (font size, ((line, x, y), ...)) with each line's top left corner.
+    """
+    width = card_size - 2 * CARD_PADDING
+    for size in CARD_FONT_SIZES:
+        lines = []
+        for paragraph in text.split('\n'):
+            line = ''
+            for word in paragraph.split():
+                candidate = f"{line} {word}" if line else word
+                if line and text_width(font_file, size, candidate) > width:
+                    lines.append(line)
+                    line = word
+                else:
+                    line = candidate
+            lines.append(line)
+        
+        line_height = size * CARD_LINE_SPACING
+        fits = all(text_width(font_file, size, line) <= width for line in lines)
+        if (fits and line_height * len(lines) <= width) or size == CARD_FONT_SIZES[-1]:
+            break
+    
+    top = (card_size - line_height * len(lines)) / 2
+    runs = tuple(
+        (line, (card_size - text_width(font_file, size, line)) / 2, top + i * line_height)
+        for i, line in enumerate(lines)
+    )
+    return size, runs
+
+@functools.lru_cache(maxsize=1024)
+def glyph_run(font_file, size, line):
+    """
+    Render a line of text to a mask, cached so lines shared by many cards are only rendered once.
+    
+    Args:
+        font_file (str): Path to a TrueType font, or None for the default font.
+        size (int): Font size in pixels.
+        line (str): Line of text.
+    
+    Returns:
+        Image: Grayscale mask of the line.
+    """
+    font = load_font(font_file, size)
+    try:
+        left, top, right, bottom = font.getbbox(line)
+    except AttributeError:
+        # The bitmap default font of Pillow before 9.2 only has getsize
+        right, bottom = font.getsize(line)
+    mask = Image.new('L', (max(1, math.ceil(right)), max(1, math.ceil(bottom))), 0)
+    ImageDraw.Draw(mask).text((0, 0), line, fill=255, font=font)
+    return mask
+
+@functools.lru_cache(maxsize=16)
+def card_palette(foreground, background):
+    """
+    Build a palette that fades from the background to the text color.
+    
+    Args:
+        foreground (str): Text color.
+        background (str): Background color.
+    
+    Returns:
+        list: 256 RGB entries, flattened.
+    """
+    fg = ImageColor.getrgb(foreground)[:3]
+    bg = ImageColor.getrgb(background)[:3]
+    return [round(b + (f - b) * i / 255) for i in range(256) for f, b in zip(fg, bg)]
+
+def render_text_card(text, path, font_file=None, card_size=CARD_SIZE, foreground='black', background='white'):
+    """
+    Render a text card to a file.
+    
+    Args:
+        text (str): Text of the card.
+        path (str): Where to save the card.
+        font_file (str, optional): Path to a TrueType font.
+        card_size (int): Width and height of the card in pixels.
+        foreground (str): Text color.
+        background (str): Background color.
+    
+    Returns:
+        tuple: (path to the card, render time in seconds).
+    """
+    start = time.perf_counter()
+    size, runs = layout_text(text, font_file, card_size)
+    
+    # Draw the text as coverage values, then map them to colors with a palette.
+    # A palette image encodes several times faster than RGB and is about as small.
+    image = Image.new('L', (card_size, card_size), 0)
+    for line, x, y in runs:
+        if line:
+            image.paste(255, (round(x), round(y)), glyph_run(font_file, size, line))
+    image.putpalette(card_palette(foreground, background))
+    
+    # Write to a temporary file first so a half-written card is never uploaded
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    image.save(temp_path, format='PNG', compress_level=1)
+    os.replace(temp_path, path)
+    return path, time.perf_counter() - start
+
+def _render_card_task(task):
+    """Render one card in a worker process. Takes the arguments as a tuple so it can be mapped."""
+    return render_text_card(*task)
+
+def clock_key(hour, minute, second, size=256):
+    """
+    Get the render cache key of a clock frame.
+    
+    Args:
+        hour (int): Hour, only the position on the 12-hour dial matters.
+        minute (int): Minute.
+        second (int): Second.
+        size (int): Width and height of the image in pixels.
+        
+    Returns:
+        str: Cache key.
+    """
+    return f"clock-v1-{size}-{hour % 12:02d}{minute:02d}{second:02d}.png"
+
+def draw_clock(hour, minute, second, size=256):
+    """
+    Draw a clock face showing a time.
+    
+    Args:
+        hour (int): Hour.
+        minute (int): Minute.
+        second (int): Second.
+        size (int): Width and height of the image in pixels.
+        
+    Returns:
+        Image: The clock image.
+    """
+    hour = hour % 12
+
+    # Create a square image with white background
+    image = Image.new('RGB', (size, size), 'white')
+    draw = ImageDraw.Draw(image)
+    scale = size / 256  # Hand widths are tuned for 256x256
+
+    # Calculate center and radius
+    center = (size/2, size/2)
+    radius = size/2 - 10 * scale  # Slightly larger radius since we removed markers
+
+    # Draw hour hand
+    hour_angle = (hour + minute/60) * 30 * math.pi / 180
+    hour_length = radius * 0.5
+    hour_end = (center[0] + hour_length * math.sin(hour_angle),
+               center[1] - hour_length * math.cos(hour_angle))
+    draw.line([center, hour_end], fill='black', width=max(1, round(8 * scale)))  # Thicker hour hand
+
+    # Draw minute hand
+    minute_angle = minute * 6 * math.pi / 180
+    minute_length = radius * 0.7
+    minute_end = (center[0] + minute_length * math.sin(minute_angle),
+                 center[1] - minute_length * math.cos(minute_angle))
+    draw.line([center, minute_end], fill='black', width=max(1, round(4 * scale)))  # Thicker minute hand
+
+    # Draw second hand
+    second_angle = second * 6 * math.pi / 180
+    second_length = radius * 0.9  # Longer than minute hand
+    second_end = (center[0] + second_length * math.sin(second_angle),
+                 center[1] - second_length * math.cos(second_angle))
+    draw.line([center, second_end], fill='red', width=max(1, round(2 * scale)))  # Thin red second hand
+
+    # Draw center dot
+    dot_radius = 8 * scale
+    draw.ellipse([center[0]-dot_radius, center[1]-dot_radius,
+                 center[0]+dot_radius, center[1]+dot_radius],
+                 fill='black')
+    return image
+
 class ImageHandler:
     """Handler for image operations."""
     
-    def __init__(self, pics_folder="pics", temp_folder="temp_clock"):
+    def __init__(self, pics_folder="pics", temp_folder="temp_clock", cards_folder="cards", font_file=None,
+                 render_cache_dir=None):
         """
         Initialize the image handler.
         
         Args:
             pics_folder (str): Folder containing profile pictures.
             temp_folder (str): Folder for temporary clock images.
+            cards_folder (str): Folder for rendered text cards, kept between runs.
+            font_file (str, optional): TrueType font for text cards. Defaults to Pillow's font.
+            render_cache_dir (str, optional): Render cache shared with other sessions on the host.
         """
         self.pics_folder = pics_folder
         self.temp_folder = temp_folder
+        self.cards_folder = cards_folder
+        self.font_file = font_file
         self.image_files = []
+        self.render_cache = RenderCache(render_cache_dir) if render_cache_dir else None
+        self._content_hashes = {}
         
         # Ensure the pics folder exists
         if not os.path.exists(pics_folder):
@@ -67,12 +307,13 @@ class ImageHandler:
         self.image_files = image_files
         return image_files
     
-    def create_clock_image(self, timezone='Asia/Kolkata'):
+    def create_clock_image(self, timezone='Asia/Kolkata', size=256):
         """
         Create a clock image showing current time in the specified timezone.
         
         Args:
             timezone (str): Timezone to use for the clock.
+            size (int): Width and height of the image in pixels.
             
         Returns:
             str: Path to the created clock image.
@@ -84,48 +325,166 @@ class ImageHandler:
         minute = current_time.minute
         second = current_time.second
 
-        # Create a square image with white background (256x256)
-        size = 256
-        image = Image.new('RGB', (size, size), 'white')
-        draw = ImageDraw.Draw(image)
-
-        # Calculate center and radius
-        center = (size/2, size/2)
-        radius = size/2 - 10  # Slightly larger radius since we removed markers
-
-        # Draw hour hand
-        hour_angle = (hour + minute/60) * 30 * math.pi / 180
-        hour_length = radius * 0.5
-        hour_end = (center[0] + hour_length * math.sin(hour_angle),
-                   center[1] - hour_length * math.cos(hour_angle))
-        draw.line([center, hour_end], fill='black', width=8)  # Thicker hour hand
-
-        # Draw minute hand
-        minute_angle = minute * 6 * math.pi / 180
-        minute_length = radius * 0.7
-        minute_end = (center[0] + minute_length * math.sin(minute_angle),
-                     center[1] - minute_length * math.cos(minute_angle))
-        draw.line([center, minute_end], fill='black', width=4)  # Thicker minute hand
-
-        # Draw second hand
-        second_angle = second * 6 * math.pi / 180
-        second_length = radius * 0.9  # Longer than minute hand
-        second_end = (center[0] + second_length * math.sin(second_angle),
-                     center[1] - second_length * math.cos(second_angle))
-        draw.line([center, second_end], fill='red', width=2)  # Thin red second hand
-
-        # Draw center dot
-        dot_radius = 8
-        draw.ellipse([center[0]-dot_radius, center[1]-dot_radius,
-                     center[0]+dot_radius, center[1]+dot_radius],
-                     fill='black')
+        # Sessions sharing a render cache render each frame only once
+        if self.render_cache:
+            filename = self.render_cache.fetch(
+                clock_key(hour, minute, second, size),
+                lambda path: draw_clock(hour, minute, second, size).save(path, format='PNG')
+            )
+            logger.info(f"Created clock image: {filename}")
+            return filename
 
         # Save the image
+        image = draw_clock(hour, minute, second, size)
         filename = os.path.join(self.temp_folder, "clock.png")
         image.save(filename)
         logger.info(f"Created clock image: {filename}")
         return os.path.abspath(filename)
     
+    def normalize_image(self, image_path, size=640):
+        """
+        Crop an image to a centered square and scale it to the avatar size.
+        
+        JPEGs are decoded at a reduced scale when they are much larger than the
+        target, which is most of the work saved for camera photos.
+        
+        Args:
+            image_path (str): Path to the image.
+            size (int): Width and height of the result in pixels.
+            
+        Returns:
+            str: Path to the normalized JPEG, in the render cache if there is one.
+        """
+        if self.render_cache:
+            # Keyed by content, so copies of a picture in different folders are shared too
+            key = f"normalized-v1-{size}-{self._content_hash(image_path)}.jpg"
+            return self.render_cache.fetch(key, lambda path: self._normalize(image_path, size, path))
+        
+        key = hashlib.sha1(f"{os.path.abspath(image_path)}\0{size}".encode('utf-8')).hexdigest()[:16]
+        filename = os.path.join(self.temp_folder, f"normalized_{key}.jpg")
+        self._normalize(image_path, size, filename)
+        return os.path.abspath(filename)
+    
+    def _normalize(self, image_path, size, filename):
+        """Crop, scale and save one picture. See normalize_image."""
+        with Image.open(image_path) as source:
+            source.draft('RGB', (size, size))
+            image = ImageOps.exif_transpose(source).convert('RGB')
+        
+        side = min(image.size)
+        left = (image.width - side) // 2
+        top = (image.height - side) // 2
+        image = image.resize(
+            (size, size),
+            Image.LANCZOS,
+            box=(left, top, left + side, top + side),
+            reducing_gap=2.0
+        )
+        image.save(filename, format='JPEG', quality=90)
+    
+    def _content_hash(self, image_path):
+        """
+        Hash the content of a picture, remembering it until the file changes.
+        
+        Args:
+            image_path (str): Path to the picture.
+            
+        Returns:
+            str: SHA-1 hex digest of the file.
+        """
+        stat = os.stat(image_path)
+        memo_key = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+        digest = self._content_hashes.get(memo_key)
+        if digest is None:
+            with open(image_path, 'rb') as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+            self._content_hashes[memo_key] = digest
+        return digest
+    
+    def load_card_texts(self, cards_file):
+        """
+        Load the texts of the text cards from a file.
+        
+        Each non-empty line is one card, with "\\n" for a line break. A line with
+        "{n}" can end in " x COUNT" to make a counter: "Day {n} x 365" gives the
+        cards "Day 1" to "Day 365".
+        
+        Args:
+            cards_file (str): Path to the source file.
+        
+        Returns:
+            list: Card texts.
+        """
+        texts = []
+        with open(cards_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                
+                count = 1
+                head, sep, tail = line.rpartition(' x ')
+                if sep and tail.isdigit() and '{n}' in head:
+                    line, count = head, int(tail)
+                line = line.replace('\\n', '\n')
+                for number in range(1, count + 1):
+                    texts.append(line.replace('{n}', str(number)))
+        
+        if not texts:
+            logger.error(f"No cards found in '{cards_file}'.")
+            raise FileNotFoundError(f"No cards found in '{cards_file}'.")
+        return texts
+    
+    def prerender_text_cards(self, texts, workers=None):
+        """
+        Render text cards ahead of the run in a pool of worker processes.
+        
+        Cards are named after a hash of their text and font, so cards rendered
+        by an earlier run are reused as they are.
+        
+        Args:
+            texts (list): Card texts.
+            workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        
+        Returns:
+            list: Paths to the cards, in the order of the texts.
+        """
+        os.makedirs(self.cards_folder, exist_ok=True)
+        
+        paths = []
+        tasks = []
+        for text in texts:
+            key = hashlib.sha1(f"{self.font_file}\0{CARD_SIZE}\0{text}".encode('utf-8')).hexdigest()[:16]
+            path = os.path.abspath(os.path.join(self.cards_folder, f"card_{key}.png"))
+            paths.append(path)
+            if not os.path.exists(path):
+                tasks.append((text, path, self.font_file))
+        # Render repeated texts only once
+        tasks = list({task[1]: task for task in tasks}.values())
+        
+        if tasks:
+            start = time.perf_counter()
+            workers = workers or os.cpu_count() or 1
+            if workers > 1 and len(tasks) > 1:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    chunksize = max(1, len(tasks) // (workers * 4))
+                    results = list(executor.map(_render_card_task, tasks, chunksize=chunksize))
+            else:
+                results = [_render_card_task(task) for task in tasks]
+            elapsed = time.perf_counter() - start
+            
+            times = sorted(seconds for _, seconds in results)
+            slowest_path, slowest = max(results, key=lambda result: result[1])
+            logger.info(
+                f"Rendered {len(results)} text cards in {elapsed:.2f}s with {workers} workers. "
+                f"Per card: mean {sum(times) / len(times) * 1000:.1f} ms, "
+                f"p95 {times[min(len(times) - 1, int(len(times) * 0.95))] * 1000:.1f} ms, "
+                f"max {slowest * 1000:.1f} ms ({os.path.basename(slowest_path)})"
+            )
+        
+        logger.info(f"{len(paths)} text cards ready, {len(paths) - len(tasks)} reused from '{self.cards_folder}'.")
+        return paths
+    
     def cleanup(self):
         """Clean up temporary files."""
         if os.path.exists(self.temp_folder):
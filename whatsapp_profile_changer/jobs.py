@@ -0,0 +1,75 @@
+"""
+Update job module for WhatsApp Profile Changer.
+"""
+
+# Text fields of the profile drawer, in the order they appear on the page
+TEXT_FIELDS = ("name", "about")
+
+class UpdateJob:
+    """A set of profile fields to change during one visit to the profile pane."""
+    
+    def __init__(self, photo=None, about=None, name=None):
+        """
+        Initialize the update job.
+        
+        Args:
+            photo (str, optional): Path to the new profile picture.
+            about (str, optional): New about text.
+            name (str, optional): New display name.
+        """
+        self.photo = photo
+        self.about = about
+        self.name = name
+        self.results = {}
+        # Run position of the photo, recorded in the state journal once it is uploaded
+        self.position = None
+    
+    def text_fields(self):
+        """
+        Get the text fields to change.
+        
+        Returns:
+            list: (field, text) pairs in page order.
+        """
+        return [(field, getattr(self, field)) for field in TEXT_FIELDS if getattr(self, field)]
+    
+    def fields(self):
+        """
+        Get the names of all fields to change.
+        
+        Returns:
+            list: Field names.
+        """
+        fields = [field for field, _ in self.text_fields()]
+        if self.photo:
+            fields.append('photo')
+        return fields
+    
+    def succeeded(self):
+        """
+        Check whether every field was changed.
+        
+        Returns:
+            bool: True if all fields in the job were applied successfully.
+        """
+        return all(self.results.get(field) for field in self.fields())
+    
+    def report(self):
+        """
+        Describe the outcome of each field.
+        
+        Returns:
+            str: Per-field success, e.g. "name: ok, about: failed, photo: ok".
+        """
+        return ", ".join(
+            f"{field}: {'ok' if self.results.get(field) else 'failed'}" for field in self.fields()
+        )
+    
+    def to_dict(self):
+        """
+        Get the job as a dictionary.
+        
+        Returns:
+            dict: The fields of the job.
+        """
+        return {'photo': self.photo, 'about': self.about, 'name': self.name}
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+State journal module for WhatsApp Profile Changer.
+
+Keeps track of where the run is, so that after a crash or restart it can carry
+on with the next picture instead of starting the sequence over.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+def hash_file(path):
+    """
+    Get the content hash of a file.
+    
+    Args:
+        path (str): Path to the file.
+    
+    Returns:
+        str: Hex digest of the file contents.
+    """
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class StateJournal:
+    """Append-only journal of successful profile changes."""
+    
+    def __init__(self, path, compact_every=100):
+        """
+        Initialize the state journal.
+        
+        Every successful change appends one line to the journal. Each line is
+        written with a single append, so a crash leaves at most one torn line at
+        the end, which is ignored on load. Once the journal holds compact_every
+        lines it is rewritten atomically down to the latest entry.
+        
+        Args:
+            path (str): Path to the journal file.
+            compact_every (int): Number of entries after which the journal is compacted.
+        """
+        self.path = path
+        self.compact_every = compact_every
+        self.entries = 0
+        self._fd = None
+    
+    def load(self):
+        """
+        Load the latest state from the journal.
+        
+        Returns:
+            dict: The latest entry, or None if there is no usable state.
+        """
+        if not os.path.exists(self.path):
+            return None
+        
+        state = None
+        torn = False
+        self.entries = 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        state = json.loads(line)
+                        self.entries += 1
+                    except ValueError:
+                        # Torn write from a crash, keep the last complete entry
+                        torn = True
+        except Exception as e:
+            logger.error(f"Error reading state journal: {str(e)}")
+            return None
+        
+        if state and torn:
+            # Rewrite the journal so new entries don't get appended to the torn line
+            self.compact(state)
+        
+        if state:
+            logger.info(f"Loaded state from {self.path}: position {state.get('position')}")
+        return state
+    
+    def record(self, position, image_hash, mode, uploaded_at=None):
+        """
+        Append a successful change to the journal.
+        
+        Args:
+            position (int or list): Position of the uploaded image in the sequence, or [pass, index] in a playlist.
+            image_hash (str): Content hash of the uploaded image.
+            mode (str): Mode the change was made in.
+            uploaded_at (float, optional): Upload time as a Unix timestamp. Defaults to now.
+        """
+        entry = {
+            'position': position,
+            'uploaded_at': time.time() if uploaded_at is None else uploaded_at,
+            'hash': image_hash,
+            'mode': mode
+        }
+        try:
+            if self.entries >= self.compact_every:
+                self.compact(entry)
+                return
+            
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            os.write(self._fd, (json.dumps(entry, separators=(',', ':')) + '\n').encode('utf-8'))
+            os.fsync(self._fd)
+            self.entries += 1
+        except Exception as e:
+            logger.error(f"Error writing state journal: {str(e)}")
+    
+    def compact(self, entry):
+        """
+        Atomically replace the journal with a single entry.
+        
+        Args:
+            entry (dict): The entry to keep.
+        """
+        self.close()
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self.entries = 1
+    
+    def close(self):
+        """Close the journal file."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
\ No newline at end of file
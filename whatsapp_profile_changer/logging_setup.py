@@ -0,0 +1,208 @@
+"""
+Logging setup module for WhatsApp Profile Changer.
+
+Log records are put on a queue and written by a single background thread, so
+the main loop never blocks on log I/O. Repeated warnings and errors, like the
+retry notices of a failing loop, are rate limited and the number of suppressed
+lines is reported once they are let through again.
+"""
+
+import sys
+import copy
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_listener = None
+_handler = None
+
+class JsonFormatter(logging.Formatter):
+    """Formatter that writes each record as one line of JSON."""
+    
+    def format(self, record):
+        """
+        Format a record as JSON.
+        
+        Args:
+            record (LogRecord): The record to format.
+        
+        Returns:
+            str: JSON object with time, level, logger and message.
+        """
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            entry['suppressed'] = suppressed
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry)
+
+class FormattingQueueHandler(QueueHandler):
+    """Queue handler that keeps the traceback apart from the message."""
+    
+    def prepare(self, record):
+        """
+        Make a record safe to pass to the writer thread.
+        
+        The stock handler merges the traceback into the message, which would leave
+        JsonFormatter nothing to put under "exception". Here the message arguments
+        are merged and the traceback is kept as text in exc_text, which every
+        formatter prints.
+        
+        Args:
+            record (LogRecord): The record to prepare.
+        
+        Returns:
+            LogRecord: A copy without unpicklable or thread-bound parts.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class RateLimitFilter(logging.Filter):
+    """Filter that lets through at most `burst` identical messages per interval."""
+    
+    def __init__(self, interval=60.0, burst=3, level=logging.WARNING):
+        """
+        Initialize the rate limit filter.
+        
+        Args:
+            interval (float): Length of the rate limit window in seconds.
+            burst (int): Number of identical messages allowed per window.
+            level (int): Lowest level that is rate limited. Progress messages below
+                         it repeat every cycle by design and are always let through.
+        """
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self.level = level
+        self.windows = {}
+        self.lock = threading.Lock()
+    
+    def filter(self, record):
+        """
+        Decide whether a record is logged.
+        
+        Args:
+            record (LogRecord): The record to check.
+        
+        Returns:
+            bool: True if the record should be logged.
+        """
+        if record.levelno < self.level:
+            return True
+        
+        key = (record.name, record.levelno, record.getMessage())
+        now = time.monotonic()
+        with self.lock:
+            window = self.windows.get(key)
+            if window is None and len(self.windows) >= 1000:
+                self._prune(now)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self.windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                    record.msg = f"{record.getMessage()} ({suppressed} similar lines suppressed)"
+                    record.args = None
+                return True
+            
+            window[1] += 1
+            if window[1] <= self.burst:
+                return True
+            window[2] += 1
+            return False
+    
+    def _prune(self, now):
+        """Forget messages whose window is over and that have nothing suppressed."""
+        for key, window in list(self.windows.items()):
+            if now - window[0] >= self.interval and not window[2]:
+                del self.windows[key]
+    
+    def flush(self):
+        """
+        Get the messages that still have suppressed lines and reset the counts.
+        
+        Returns:
+            list: (logger name, level, message, suppressed count) tuples.
+        """
+        with self.lock:
+            pending = [(name, level, message, window[2])
+                       for (name, level, message), window in self.windows.items() if window[2]]
+            self.windows.clear()
+        return pending
+
+def setup_logging(level=logging.INFO, json_format=False, rate_limit=60.0, burst=3, stream=None,
+                  rate_limit_level=logging.WARNING):
+    """
+    Set up queue-based logging with one background writer.
+    
+    Args:
+        level (int): Log level.
+        json_format (bool): Write structured JSON lines instead of text.
+        rate_limit (float): Rate limit window in seconds for repeated messages, 0 disables it.
+        burst (int): Identical messages allowed per rate limit window.
+        stream (file, optional): Where to write logs. Defaults to stdout.
+        rate_limit_level (int): Lowest level that is rate limited.
+    
+    Returns:
+        QueueListener: The background writer.
+    """
+    global _listener, _handler
+    shutdown_logging()
+    
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+    
+    _handler = FormattingQueueHandler(queue.Queue(-1))
+    if rate_limit:
+        _handler.addFilter(RateLimitFilter(interval=rate_limit, burst=burst, level=rate_limit_level))
+    
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_handler)
+    root.setLevel(level)
+    
+    _listener = QueueListener(_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def shutdown_logging():
+    """Report suppressed lines and stop the background writer, flushing queued records."""
+    global _listener, _handler
+    if _handler:
+        for log_filter in _handler.filters:
+            if isinstance(log_filter, RateLimitFilter):
+                for name, level, message, suppressed in log_filter.flush():
+                    record = logging.LogRecord(
+                        name, level, __file__, 0, f"{message} ({suppressed} similar lines suppressed)", None, None
+                    )
+                    record.suppressed = suppressed
+                    _handler.handle(record)
+    if _listener:
+        _listener.stop()
+        _listener = None
+    if _handler:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+
+atexit.register(shutdown_logging)
\ No newline at end of file
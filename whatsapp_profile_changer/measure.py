@@ -0,0 +1,224 @@
+"""
+Resource measurement module for WhatsApp Profile Changer.
+
+Runs the avatar flow against the local WhatsApp Web fixture with each browser
+profile and reports the steady-state memory (RSS) and CPU use of the whole
+browser process tree, so the cost of one session can be compared between the
+"default" and "lean" profiles. It also counts the WebDriver round trips per
+change, to compare the "webdriver" and "script" execution strategies.
+
+Usage:
+    python -m whatsapp_profile_changer.measure [--cycles N] [--window SECONDS] [--strategies ...]
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+from PIL import Image
+from .logging_setup import setup_logging
+from .browser import Browser, BROWSER_PROFILES, BROWSER_STRATEGIES
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "whatsapp_web.html")
+
+def fixture_url():
+    """
+    Get the URL of the local WhatsApp Web fixture.
+    
+    Returns:
+        str: file:// URL of the fixture page.
+    """
+    return Path(FIXTURE_PATH).as_uri()
+
+def _read_proc_stat(pid):
+    """
+    Read parent pid and CPU ticks of a process from /proc.
+    
+    Args:
+        pid (int): Process id.
+    
+    Returns:
+        tuple: (parent pid, user + system CPU ticks), or None if the process is gone.
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # The command name may contain spaces, so split after the closing parenthesis
+    fields = stat[stat.rindex(')') + 2:].split()
+    return int(fields[1]), int(fields[11]) + int(fields[12])
+
+def _read_rss(pid):
+    """
+    Read the resident set size of a process from /proc.
+    
+    Args:
+        pid (int): Process id.
+    
+    Returns:
+        int: RSS in bytes, 0 if the process is gone.
+    """
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return 0
+
+def process_tree(root_pid):
+    """
+    Get the pids of a process and all of its descendants.
+    
+    Args:
+        root_pid (int): Pid at the top of the tree (chromedriver).
+    
+    Returns:
+        list: Pids in the tree, including root_pid.
+    """
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        stat = _read_proc_stat(int(entry))
+        if stat:
+            children.setdefault(stat[0], []).append(int(entry))
+    
+    pids = [root_pid]
+    for pid in pids:
+        pids.extend(children.get(pid, []))
+    return pids
+
+def sample_usage(root_pid):
+    """
+    Sample total RSS and CPU time of a process tree.
+    
+    Args:
+        root_pid (int): Pid at the top of the tree.
+    
+    Returns:
+        tuple: (RSS in bytes, CPU time in seconds).
+    """
+    ticks_per_second = os.sysconf("SC_CLK_TCK")
+    rss = 0
+    cpu_ticks = 0
+    for pid in process_tree(root_pid):
+        stat = _read_proc_stat(pid)
+        if stat:
+            cpu_ticks += stat[1]
+            rss += _read_rss(pid)
+    return rss, cpu_ticks / ticks_per_second
+
+def _run_cycle(browser, image_path):
+    """
+    Run one profile picture change against the fixture.
+    
+    Returns:
+        bool: True if the change went through.
+    """
+    return (browser.open_profile_drawer()
+            and browser.arm_upload()
+            and browser.upload_profile_picture(image_path))
+
+def measure_profile(profile, url, image_path, cycles=3, window=10.0, samples=5, strategy="webdriver"):
+    """
+    Measure the steady-state resource use of one browser session.
+    
+    The flow is run a few times to warm the browser up, then RSS and CPU are
+    sampled while the session sits idle between changes, which is where a
+    long-running session spends almost all of its time.
+    
+    Args:
+        profile (str): Browser profile to measure.
+        url (str): Page to open.
+        image_path (str): Image to upload in each cycle.
+        cycles (int): Number of warm-up changes.
+        window (float): Seconds to sample over.
+        samples (int): Number of RSS samples in the window.
+        strategy (str): Browser execution strategy.
+    
+    Returns:
+        dict: Measurement results for the profile.
+    """
+    browser = Browser(profile=profile, url=url, strategy=strategy)
+    try:
+        browser.setup()
+        if not browser.wait_for_login(timeout=30):
+            raise RuntimeError("Fixture page did not load")
+        
+        round_trips = browser.round_trips
+        successes = sum(1 for _ in range(cycles) if _run_cycle(browser, image_path))
+        round_trips = (browser.round_trips - round_trips) / cycles
+        root_pid = browser.driver.service.process.pid
+        
+        rss_samples = []
+        _, cpu_start = sample_usage(root_pid)
+        start = time.monotonic()
+        for _ in range(samples):
+            time.sleep(window / samples)
+            rss, cpu_end = sample_usage(root_pid)
+            rss_samples.append(rss)
+        elapsed = time.monotonic() - start
+        
+        return {
+            'profile': profile,
+            'strategy': strategy,
+            'round_trips': round_trips,
+            'cycles': cycles,
+            'successful_cycles': successes,
+            'processes': len(process_tree(root_pid)),
+            'rss_mb': statistics.median(rss_samples) / (1024 * 1024),
+            'cpu_percent': (cpu_end - cpu_start) / elapsed * 100,
+        }
+    finally:
+        browser.cleanup()
+
+def main(argv=None):
+    """Measure every browser profile and print a comparison."""
+    parser = argparse.ArgumentParser(
+        description='Measure steady-state RSS and CPU per session for each browser profile.'
+    )
+    parser.add_argument('--profiles', nargs='+', choices=BROWSER_PROFILES, default=list(BROWSER_PROFILES),
+                        help='Browser profiles to measure')
+    parser.add_argument('--strategies', nargs='+', choices=BROWSER_STRATEGIES, default=['webdriver'],
+                        help='Browser execution strategies to measure')
+    parser.add_argument('--url', default=None, help='Page to measure against (defaults to the local fixture)')
+    parser.add_argument('--cycles', type=int, default=3, help='Warm-up profile changes per session')
+    parser.add_argument('--window', type=float, default=10.0, help='Seconds to sample steady-state usage over')
+    args = parser.parse_args(argv)
+    
+    if not os.path.isdir("/proc"):
+        logger.error("Measurement reads /proc and is only supported on Linux.")
+        return 1
+    
+    url = args.url or fixture_url()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        image_path = os.path.join(temp_dir, "avatar.png")
+        Image.new('RGB', (256, 256), 'white').save(image_path)
+        
+        results = []
+        for profile in args.profiles:
+            for strategy in args.strategies:
+                logger.info(f"Measuring {profile} profile with {strategy} strategy against {url}")
+                results.append(measure_profile(profile, url, image_path, cycles=args.cycles,
+                                               window=args.window, strategy=strategy))
+    
+    print(f"{'profile':<10} {'strategy':<10} {'cycles':>8} {'trips':>6} {'procs':>6} {'rss (MB)':>10} {'cpu (%)':>8}")
+    for result in results:
+        print(f"{result['profile']:<10} {result['strategy']:<10} "
+              f"{result['successful_cycles']:>4}/{result['cycles']:<3} "
+              f"{result['round_trips']:>6.0f} "
+              f"{result['processes']:>6} "
+              f"{result['rss_mb']:>10.1f} "
+              f"{result['cpu_percent']:>8.1f}")
+    return 0
+
+if __name__ == "__main__":
+    setup_logging()
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,313 @@
+"""
+Playlist module for WhatsApp Profile Changer.
+
+A playlist file lists the pictures to cycle through, one entry per line, with
+an optional weight and repeat limit separated by tabs:
+
+    # path<TAB>weight<TAB>repeat
+    pics/1.png
+    ~/holiday/beach.jpg	3
+    /srv/avatars/*.png	1	2
+
+Entries can be files, folders or glob patterns, and relative paths are resolved
+against the folder of the playlist file. The weight makes an item come up
+earlier in a shuffled pass, and the repeat limit is the number of passes an item
+takes part in (0, the default, means no limit).
+
+Paths are kept in one UTF-8 buffer with an array of offsets, and weights and
+limits in typed arrays, so playlists with millions of entries load quickly and
+stay small in memory.
+"""
+
+import os
+import glob
+import random
+import logging
+from array import array
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp')
+
+class Playlist:
+    """Array-backed playlist with weighted, no-repeat shuffle."""
+    
+    def __init__(self, shuffle=False, seed=0):
+        """
+        Initialize an empty playlist.
+        
+        Args:
+            shuffle (bool): Play each pass in weighted random order instead of playlist order.
+            seed (int): Seed for the shuffle. Each pass is shuffled from this seed and the
+                        pass number, so a position can be restored after a restart.
+        """
+        self.shuffle = shuffle
+        self.seed = seed
+        self.data = bytearray()
+        self.offsets = array('Q', [0])
+        self.weights = array('d')
+        self.limits = array('I')
+        self.pass_number = 0
+        self.cursor = 0
+        self.order = None
+        self.next_order = None
+    
+    @classmethod
+    def from_files(cls, files, shuffle=False, seed=0):
+        """
+        Create a playlist of files with equal weights and no repeat limits.
+        
+        Args:
+            files (iterable): Image file paths.
+            shuffle (bool): Shuffle each pass.
+            seed (int): Seed for the shuffle.
+        
+        Returns:
+            Playlist: The playlist.
+        """
+        playlist = cls(shuffle=shuffle, seed=seed)
+        for path in files:
+            playlist.add(path)
+        return playlist
+    
+    @classmethod
+    def load(cls, playlist_file, shuffle=False, seed=0):
+        """
+        Load a playlist file.
+        
+        Args:
+            playlist_file (str): Path to the playlist file.
+            shuffle (bool): Shuffle each pass.
+            seed (int): Seed for the shuffle.
+        
+        Returns:
+            Playlist: The playlist.
+        """
+        playlist = cls(shuffle=shuffle, seed=seed)
+        base_folder = os.path.dirname(os.path.abspath(playlist_file))
+        
+        # Bound methods and locals keep the per-line cost down for huge playlists
+        data = playlist.data
+        append_offset = playlist.offsets.append
+        append_weight = playlist.weights.append
+        append_limit = playlist.limits.append
+        
+        with open(playlist_file, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.rstrip('\r\n')
+                if not line or line[0] == '#' or not line.strip():
+                    continue
+                
+                path, _, rest = line.partition('\t')
+                weight = 1.0
+                limit = 0
+                if rest:
+                    weight_field, _, limit_field = rest.partition('\t')
+                    try:
+                        weight = float(weight_field) if weight_field.strip() else 1.0
+                        limit = int(limit_field) if limit_field.strip() else 0
+                    except ValueError:
+                        raise ValueError(f"{playlist_file}:{line_number}: invalid weight or repeat limit")
+                    if weight <= 0 or limit < 0:
+                        raise ValueError(f"{playlist_file}:{line_number}: weight must be positive and repeat limit not negative")
+                
+                path = path.strip()
+                if not path:
+                    raise ValueError(f"{playlist_file}:{line_number}: missing path")
+                if path[0] == '~':
+                    path = os.path.expanduser(path)
+                if not os.path.isabs(path):
+                    path = os.path.join(base_folder, path)
+                
+                if path.lower().endswith(IMAGE_EXTENSIONS) and not glob.has_magic(path):
+                    # Plain image file, the common case
+                    paths = (path,)
+                else:
+                    paths = _expand(path)
+                
+                for image_path in paths:
+                    data += image_path.encode('utf-8')
+                    append_offset(len(data))
+                    append_weight(weight)
+                    append_limit(limit)
+        
+        if not len(playlist):
+            raise FileNotFoundError(f"No images found in playlist '{playlist_file}'.")
+        
+        logger.info(f"Loaded {len(playlist)} playlist entries from {playlist_file}")
+        return playlist
+    
+    def add(self, path, weight=1.0, limit=0):
+        """
+        Add an entry to the playlist.
+        
+        Args:
+            path (str): Image file path.
+            weight (float): Shuffle weight.
+            limit (int): Number of passes the entry takes part in, 0 for no limit.
+        """
+        self.data += path.encode('utf-8')
+        self.offsets.append(len(self.data))
+        self.weights.append(weight)
+        self.limits.append(limit)
+        self.order = None
+        self.next_order = None
+    
+    def __len__(self):
+        """Number of entries in the playlist."""
+        return len(self.offsets) - 1
+    
+    def path(self, index):
+        """
+        Get the path of an entry.
+        
+        Args:
+            index (int): Entry index.
+        
+        Returns:
+            str: Image file path.
+        """
+        return self.data[self.offsets[index]:self.offsets[index + 1]].decode('utf-8')
+    
+    @property
+    def position(self):
+        """Current position as [pass number, index within the pass]."""
+        return [self.pass_number, self.cursor]
+    
+    def seek(self, position):
+        """
+        Move to a position returned by `position`.
+        
+        Args:
+            position (list): [pass number, index within the pass].
+        """
+        self.pass_number, self.cursor = int(position[0]), int(position[1])
+        self.order = None
+        self.next_order = None
+    
+    def current(self):
+        """
+        Get the entry at the current position without moving on.
+        
+        Returns:
+            str: Image file path.
+        
+        Raises:
+            StopIteration: When every entry has used up its repeat limit.
+        """
+        self._ensure_order()
+        return self.path(self.order[self.cursor])
+    
+    def next(self):
+        """
+        Get the entry at the current position and move on.
+        
+        Returns:
+            str: Image file path.
+        
+        Raises:
+            StopIteration: When every entry has used up its repeat limit.
+        """
+        self._ensure_order()
+        index = self.order[self.cursor]
+        self.cursor += 1
+        return self.path(index)
+    
+    def prepare(self):
+        """
+        Build the order of the next pass ahead of time when the current one is done.
+        
+        Building an order takes a while for huge playlists, so call this while
+        idle to keep it out of the next call to `next`.
+        """
+        if self.order is not None and self.cursor >= len(self.order) and self.next_order is None:
+            self.next_order = self._build_order(self.pass_number + 1, previous=self.order)
+    
+    def _ensure_order(self):
+        """Build the order of the current pass, moving to the next pass when this one is done."""
+        if self.order is not None and self.cursor >= len(self.order):
+            self.pass_number += 1
+            self.cursor = 0
+            if self.next_order is None:
+                self.next_order = self._build_order(self.pass_number, previous=self.order)
+            self.order, self.next_order = self.next_order, None
+        
+        if self.order is None:
+            self.order = self._build_order(self.pass_number)
+            if self.cursor >= len(self.order):
+                # Restored position is past the end of its pass
+                self.pass_number += 1
+                self.cursor = 0
+                self.order = self._build_order(self.pass_number, previous=self.order)
+        
+        if not self.order:
+            raise StopIteration("Every playlist entry has reached its repeat limit")
+    
+    def _build_order(self, pass_number, previous=None):
+        """
+        Build the play order of one pass.
+        
+        Every entry that hasn't reached its repeat limit is played exactly once per
+        pass. When shuffling, entries are ordered by weighted random keys, so heavier
+        entries tend to come first.
+        
+        Args:
+            pass_number (int): Pass to build the order for.
+            previous (array, optional): Order of the previous pass, if it is at hand.
+        
+        Returns:
+            array: Entry indexes in play order.
+        """
+        order = self._shuffled_order(pass_number)
+        if self.shuffle and pass_number > 0 and len(order) > 2:
+            # Don't play the last entry of the previous pass twice in a row. The
+            # swap never touches the last entry, so the previous pass can be
+            # rebuilt without its own swap.
+            if previous is None:
+                previous = self._shuffled_order(pass_number - 1)
+            if previous and order[0] == previous[-1]:
+                order[0], order[1] = order[1], order[0]
+        return order
+    
+    def _shuffled_order(self, pass_number):
+        """
+        Order the entries of one pass, in playlist order unless shuffling.
+        
+        Args:
+            pass_number (int): Pass to order.
+        
+        Returns:
+            array: Entry indexes in play order.
+        """
+        limits = self.limits
+        order = array('I', (i for i in range(len(self)) if not limits[i] or limits[i] > pass_number))
+        if not self.shuffle or len(order) < 2:
+            return order
+        
+        rng = random.Random(f"{self.seed}:{pass_number}")
+        weights = self.weights
+        if all(weights[i] == 1.0 for i in order):
+            rng.shuffle(order)
+            return order
+        
+        # Weighted random sampling without replacement (Efraimidis-Spirakis)
+        keys = array('d', (rng.random() ** (1.0 / weights[i]) for i in order))
+        ranking = sorted(range(len(order)), key=keys.__getitem__, reverse=True)
+        return array('I', (order[j] for j in ranking))
+
+def _expand(path):
+    """
+    Expand a playlist entry into image files.
+    
+    Args:
+        path (str): File, folder or glob pattern.
+    
+    Returns:
+        list: Sorted image file paths.
+    """
+    if os.path.isdir(path):
+        path = os.path.join(path, '*')
+    elif not glob.has_magic(path):
+        return [path] if os.path.isfile(path) else []
+    return sorted(p for p in glob.glob(path) if p.lower().endswith(IMAGE_EXTENSIONS))
\ No newline at end of file
@@ -4,10 +4,20 @@ Main profile changer module for WhatsApp Profile Changer.
 
 import os
 import time
+import queue
 import logging
+import threading
+from concurrent.futures import TimeoutError as FetchTimeoutError
 from .browser import Browser
 from .image_handler import ImageHandler
 from .config import Config
+from .journal import StateJournal, hash_file
+from .control import ControlServer
+from .profiling import CycleProfiler
+from .jobs import UpdateJob
+from .playlist import Playlist
+from .remote import RemoteImageSource
+from .scheduler import LeadTimeEstimator, LatencyStats
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -15,6 +25,9 @@ logger = logging.getLogger(__name__)
 class ProfileChanger:
     """Main class for WhatsApp Profile Changer."""
     
+    # Browser implementation, replaced by the fault-injection harness
+    browser_class = Browser
+    
     def __init__(self, config_file=None):
         """
         Initialize the profile changer.
@@ -31,10 +44,61 @@ class ProfileChanger:
         self.mode = settings['mode']
         self.timeout = settings['timeout']
         self.temp_folder = settings['temp_folder']
+        self.browser_profile = settings['browser_profile']
+        self.user_data_dir = settings['user_data_dir']
+        self.browser_strategy = settings['browser_strategy']
+        self.state_file = settings['state_file']
+        self.control_port = settings['control_port']
+        self.control_socket = settings['control_socket']
+        self.profile_every = settings['profile_every']
+        self.profile_dir = settings['profile_dir']
+        self.profile_memory = settings['profile_memory']
+        self.about_file = settings['about_file']
+        self.name_file = settings['name_file']
+        self.prearm = settings['prearm']
+        self.max_armed_seconds = settings['max_armed_seconds']
+        self.playlist_file = settings['playlist_file']
+        self.shuffle = settings['shuffle']
+        self.shuffle_seed = settings['shuffle_seed']
+        self.remote_url = settings['remote_url']
+        self.remote_cache = settings['remote_cache']
+        self.prefetch = settings['prefetch']
+        self.cards_file = settings['cards_file']
+        self.cards_folder = settings['cards_folder']
+        self.font_file = settings['font_file']
+        self.card_workers = settings['card_workers']
+        self.render_cache_dir = settings['render_cache_dir']
+        self.normalize_size = settings['normalize_size']
         
         # Initialize components
-        self.browser = Browser()
+        self.browser = None
         self.image_handler = None
+        self.journal = None
+        self.control_server = None
+        self.profiler = None
+        self.playlist = None
+        self.remote_source = None
+        self.cards = []
+        
+        # Run state, changed through the control API
+        self.commands = queue.Queue()
+        self._wake = threading.Event()
+        self.paused = False
+        self.stopped = False
+        self.pending_job = None
+        self.current_index = 0
+        self.text_index = 0
+        self.about_texts = []
+        self.name_texts = []
+        self.current_job = None
+        self.last_job = None
+        self.next_deadline = None
+        self.lead_time = LeadTimeEstimator()
+        self.latency = LatencyStats()
+        self.cycle = 0
+        self.changes = 0
+        self.last_change = None
+        self.round_trips = None
         
         logger.info(f"Initialized ProfileChanger with mode: {self.mode}, duration: {self.duration}s")
     
@@ -44,14 +108,61 @@ class ProfileChanger:
             # Set up image handler
             self.image_handler = ImageHandler(
                 pics_folder=self.pics_folder,
-                temp_folder=self.temp_folder
+                temp_folder=self.temp_folder,
+                cards_folder=self.cards_folder,
+                font_file=self.font_file,
+                render_cache_dir=self.render_cache_dir
             )
             
             # If in sequence mode, get the image files
             if self.mode == "sequence":
                 self.image_files = self.image_handler.get_sorted_image_files()
             
+            # If in playlist mode, load the playlist
+            if self.mode == "playlist":
+                self.playlist = self._load_playlist()
+            
+            # If in remote mode, fetch the manifest and start prefetching
+            if self.mode == "remote":
+                self.remote_source = self._load_remote_source()
+            
+            # If in text mode, render all cards before the run starts
+            if self.mode == "text":
+                self.cards = self._load_cards()
+            
+            # Load the about and name texts to rotate through
+            if self.about_file:
+                self.about_texts = self._load_texts(self.about_file)
+            if self.name_file:
+                self.name_texts = self._load_texts(self.name_file)
+            
+            # Set up state journal
+            if self.state_file:
+                self.journal = StateJournal(self.state_file)
+            
+            # Start control API
+            if self.control_port or self.control_socket:
+                self.control_server = ControlServer(
+                    self,
+                    port=self.control_port,
+                    socket_path=self.control_socket
+                )
+                self.control_server.start()
+            
+            # Set up profiling of the main loop
+            if self.profile_every:
+                self.profiler = CycleProfiler(
+                    every=self.profile_every,
+                    output_dir=self.profile_dir,
+                    trace_memory=self.profile_memory
+                )
+            
             # Set up browser
+            self.browser = self.browser_class(
+                profile=self.browser_profile,
+                user_data_dir=self.user_data_dir,
+                strategy=self.browser_strategy
+            )
             self.browser.setup()
             
             return True
@@ -59,6 +170,552 @@ class ProfileChanger:
             logger.error(f"Error setting up profile changer: {str(e)}")
             return False
     
+    def _load_texts(self, path):
+        """
+        Load texts to rotate through, one per line.
+        
+        Args:
+            path (str): Path to the text file.
+        
+        Returns:
+            list: Non-empty lines of the file.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            texts = [line.strip() for line in f if line.strip()]
+        logger.info(f"Loaded {len(texts)} texts from {path}")
+        return texts
+    
+    def _load_playlist(self):
+        """
+        Load the playlist file, or the pictures folder when no playlist file is set.
+        
+        Returns:
+            Playlist: The playlist.
+        """
+        if self.playlist_file:
+            return Playlist.load(self.playlist_file, shuffle=self.shuffle, seed=self.shuffle_seed)
+        return Playlist.from_files(
+            self.image_handler.get_sorted_image_files(),
+            shuffle=self.shuffle,
+            seed=self.shuffle_seed
+        )
+    
+    def _load_remote_source(self):
+        """
+        Fetch the manifest of the remote image source and start prefetching.
+        
+        Returns:
+            RemoteImageSource: The remote image source.
+        """
+        if not self.remote_url:
+            raise ValueError("Remote mode needs a remote_url.")
+        source = RemoteImageSource(
+            self.remote_url,
+            cache_folder=self.remote_cache,
+            prefetch=self.prefetch
+        )
+        try:
+            source.load()
+        except Exception:
+            source.close()
+            raise
+        source.prefetch(self.current_index)
+        return source
+    
+    def _load_cards(self):
+        """
+        Render the text cards of the cards file ahead of the run.
+        
+        Returns:
+            list: Paths to the rendered cards.
+        """
+        if not self.cards_file:
+            raise ValueError("Text mode needs a cards_file.")
+        texts = self.image_handler.load_card_texts(self.cards_file)
+        return self.image_handler.prerender_text_cards(texts, workers=self.card_workers or None)
+    
+    def _resume_playlist(self, state):
+        """
+        Move the playlist to the entry after the one recorded in the journal.
+        
+        Args:
+            state (dict): Latest journal entry.
+        """
+        position = state.get('position')
+        if not isinstance(position, list) or len(position) != 2:
+            return
+        
+        try:
+            self.playlist.seek(position)
+            if hash_file(self.playlist.current()) == state.get('hash'):
+                self.playlist.next()
+            pass_number, cursor = self.playlist.position
+            logger.info(f"Resuming playlist at pass {pass_number + 1}, entry {cursor + 1}")
+        except StopIteration:
+            logger.info("Playlist already finished")
+        except Exception as e:
+            logger.error(f"Error resuming playlist: {str(e)}")
+            self.playlist.seek([0, 0])
+    
+    def _find_resume_index(self, state):
+        """
+        Find the sequence position recorded in the journal.
+        
+        The recorded position is checked against the image hash, so that images
+        added to or removed from the folder since the last run don't shift the
+        sequence to the wrong picture.
+        
+        Args:
+            state (dict): Latest journal entry.
+        
+        Returns:
+            int: Index of the last uploaded image, or None if it can't be found.
+        """
+        position = state.get('position')
+        if isinstance(position, int) and 0 <= position < len(self.image_files):
+            if hash_file(self.image_files[position]) == state.get('hash'):
+                return position
+        
+        for index, image_path in enumerate(self.image_files):
+            if hash_file(image_path) == state.get('hash'):
+                return index
+        
+        if isinstance(position, int) and 0 <= position < len(self.image_files):
+            return position
+        return None
+    
+    def _restore_state(self):
+        """
+        Restore the run position from the state journal.
+        
+        Returns:
+            tuple: (index of the next image, seconds left in the current slot).
+        """
+        if not self.journal:
+            return 0, 0
+        
+        state = self.journal.load()
+        if not state or state.get('mode') != self.mode:
+            return 0, 0
+        
+        next_index = 0
+        if self.mode == "sequence":
+            last_index = self._find_resume_index(state)
+            if last_index is not None:
+                next_index = (last_index + 1) % len(self.image_files)
+                logger.info(f"Resuming sequence at image {next_index + 1} of {len(self.image_files)}")
+        elif self.mode == "playlist":
+            self._resume_playlist(state)
+        elif self.mode == "remote":
+            position = state.get('position')
+            if isinstance(position, int):
+                next_index = (position + 1) % len(self.remote_source)
+                self.remote_source.prefetch(next_index)
+                logger.info(f"Resuming remote images at image {next_index + 1} of {len(self.remote_source)}")
+        elif self.mode == "text":
+            position = state.get('position')
+            if isinstance(position, int):
+                next_index = (position + 1) % len(self.cards)
+                logger.info(f"Resuming text cards at card {next_index + 1} of {len(self.cards)}")
+        
+        remaining = self.duration - (time.time() - state.get('uploaded_at', 0))
+        return next_index, max(0, min(remaining, self.duration))
+    
+    def _record_state(self, position, image_path):
+        """
+        Record a successful change in the state journal.
+        
+        Args:
+            position (int or list): Position of the uploaded image in the sequence, or [pass, index] in a playlist.
+            image_path (str): Path to the uploaded image.
+        """
+        if self.journal:
+            self.journal.record(position, hash_file(image_path), self.mode)
+    
+    def push_job(self, job):
+        """
+        Apply an update job right away, cutting short the current wait.
+        
+        Args:
+            job (UpdateJob): The fields to change.
+        """
+        if job.photo:
+            job.photo = os.path.abspath(job.photo)
+        self._send_command('push', job)
+    
+    def pause(self):
+        """Pause profile changes until resumed."""
+        self._send_command('pause')
+    
+    def resume(self):
+        """Resume profile changes after a pause."""
+        self._send_command('resume')
+    
+    def set_mode(self, mode):
+        """
+        Switch mode from the next change on.
+        
+        Args:
+            mode (str): "sequence", "playlist", "remote", "text" or "clock".
+        """
+        self._send_command('mode', mode)
+    
+    def stop(self):
+        """Stop the run at the next safe point."""
+        self.stopped = True
+        self._wake.set()
+    
+    def get_status(self):
+        """
+        Get the current state of the run.
+        
+        Returns:
+            dict: Status information.
+        """
+        return {
+            'mode': self.mode,
+            'duration': self.duration,
+            'paused': self.paused,
+            'pending': self.pending_job.to_dict() if self.pending_job else None,
+            'position': self.playlist.position if self.mode == "playlist" else self.current_index,
+            'changes': self.changes,
+            'last_change': self.last_change,
+            'lead_time': self.lead_time.value,
+            'latency': self.latency.summary(),
+            'round_trips': self.round_trips,
+            'last_job': {
+                'results': dict(self.last_job.results),
+                'succeeded': self.last_job.succeeded()
+            } if self.last_job else None
+        }
+    
+    def _send_command(self, name, value=None):
+        """
+        Queue a command for the main loop and wake it up.
+        
+        Args:
+            name (str): Command name.
+            value: Command argument.
+        """
+        self.commands.put((name, value))
+        self._wake.set()
+    
+    def _apply_commands(self):
+        """Apply queued commands. Only called from the main loop."""
+        while True:
+            try:
+                name, value = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            
+            if name == 'push':
+                logger.info(f"Received update for immediate change: {', '.join(value.fields())}")
+                self.pending_job = value
+            elif name == 'pause':
+                logger.info("Pausing profile changes")
+                self.paused = True
+            elif name == 'resume':
+                logger.info("Resuming profile changes")
+                self.paused = False
+            elif name == 'mode' and value != self.mode:
+                try:
+                    if value == "sequence" and not getattr(self, 'image_files', None):
+                        self.image_files = self.image_handler.get_sorted_image_files()
+                    if value == "playlist" and not self.playlist:
+                        self.playlist = self._load_playlist()
+                    if value == "remote" and not self.remote_source:
+                        self.remote_source = self._load_remote_source()
+                    if value == "text" and not self.cards:
+                        self.cards = self._load_cards()
+                    self.mode = value
+                    self.current_index = 0
+                    if self.current_job:
+                        # The picked picture belongs to the old mode
+                        self.current_job.photo = None
+                    logger.info(f"Switched mode to {value}")
+                except Exception as e:
+                    logger.error(f"Error switching mode: {str(e)}")
+    
+    def _wait(self, seconds, preempt=True):
+        """
+        Wait between changes while staying responsive to commands.
+        
+        Commands are applied as soon as they arrive. A pushed image ends the wait
+        early, and while paused the wait lasts until the run is resumed.
+        
+        Args:
+            seconds (float): Seconds to wait.
+            preempt (bool): Whether a pushed image may cut the wait short.
+        """
+        deadline = time.monotonic() + seconds
+        while not self.stopped:
+            self._apply_commands()
+            if preempt and self.pending_job:
+                return
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 and not self.paused:
+                return
+            
+            self._wake.wait(None if self.paused else remaining)
+            self._wake.clear()
+    
+    def _run_cycle(self):
+        """
+        Make one profile update.
+        
+        The photo, about and name are all changed during a single visit to the
+        profile pane, so navigation is paid once per update instead of per field.
+        
+        Returns:
+            tuple: (seconds to wait before the next cycle, whether a pushed image may cut the wait short).
+        """
+        # With pre-arming, navigation starts ahead of the slot by the learned lead
+        # time and the pane waits at the file input, so only the file send and the
+        # save click are left when the slot starts.
+        pushed = self.pending_job
+        if pushed:
+            job = pushed
+        else:
+            self.current_job = self.current_job or self._next_update_job()
+            job = self.current_job
+        deadline = self.next_deadline if self.prearm and not pushed else None
+        
+        # The picture is normally picked while idle after the previous change. If
+        # not, pick it now, before navigating, with no more time than the lead
+        # time. It stays with the job if the pane is re-armed.
+        if not pushed and self.mode != "clock" and not job.photo:
+            try:
+                if not self._select_photo(job, budget=self.lead_time.value):
+                    logger.error("No remote image could be fetched. Retrying in 5 seconds...")
+                    return self._retry()
+            except StopIteration:
+                logger.info("Playlist finished. Every entry has reached its repeat limit.")
+                self.stop()
+                return 0, True
+        upload_path = job.photo
+        if job.photo and self.normalize_size and (pushed or self.mode in ("sequence", "playlist", "remote")):
+            # Crop and scale pictures to the avatar size. The journal keeps the source picture.
+            upload_path = self.image_handler.normalize_image(job.photo, size=self.normalize_size)
+        
+        # Open profile pane, changing the text fields while the drawer is open
+        logger.info("Opening profile pane...")
+        arm_start = time.monotonic()
+        if not self.browser.open_profile_drawer():
+            logger.error("Failed to open profile pane. Retrying in 5 seconds...")
+            return self._retry()
+        
+        for field, text in job.text_fields():
+            if not job.results.get(field):
+                job.results[field] = self.browser.update_text_field(field, text)
+        
+        if not pushed or pushed.photo:
+            # Arm the upload: open the photo menu and find the file input
+            if not self.browser.arm_upload():
+                logger.error("Upload option not found. Retrying in 5 seconds...")
+                return self._retry()
+            if not pushed:
+                # Pushed jobs are never pre-armed and may include ad-hoc text edits,
+                # so only scheduled cycles teach the lead time
+                self.lead_time.record(time.monotonic() - arm_start)
+            
+            if deadline is not None:
+                slack = deadline - time.monotonic()
+                if slack > self.max_armed_seconds:
+                    # Armed much too early, don't leave the pane sitting open that long
+                    logger.info(f"Armed {slack:.1f}s before the deadline. Cancelling to re-arm closer to it.")
+                    self.browser.cancel_upload()
+                    return max(0, slack - self.lead_time.value), True
+                
+                if slack < 0:
+                    logger.warning(f"Arming overshot the deadline by {-slack:.2f}s")
+                else:
+                    # Sit armed at the file input until the slot starts
+                    self._wait(slack)
+                    if self.pending_job or self.paused or self.stopped or time.monotonic() - deadline > self.max_armed_seconds:
+                        self.browser.cancel_upload()
+                        return 0, True
+            
+            if not pushed and self.mode == "clock":
+                # Create the clock image only now, so it shows the time of the slot
+                job.position = 0
+                job.photo = upload_path = self.image_handler.create_clock_image()
+            
+            # Upload the profile picture
+            job.results['photo'] = self.browser.upload_profile_picture(upload_path)
+            if not job.results['photo']:
+                logger.error("Failed to upload profile picture. Retrying in 5 seconds...")
+                return self._retry()
+            
+            if deadline is not None:
+                latency = self.browser.saved_at - deadline
+                self.latency.record(latency)
+                logger.info(f"Deadline-to-save latency: {latency:.2f}s (lead time {self.lead_time.value:.2f}s)")
+            
+            if not pushed:
+                self._record_state(job.position, job.photo)
+                if self.mode == "playlist":
+                    # Build the next pass now if this one is done, not at the next deadline
+                    self.playlist.prepare()
+        
+        if job.text_fields():
+            if job.succeeded():
+                logger.info(f"Profile update: {job.report()}")
+            else:
+                logger.warning(f"Profile update partly failed: {job.report()}")
+        
+        self.last_job = job
+        if pushed:
+            self.pending_job = None
+        else:
+            self.current_job = None
+        self.last_change = time.time()
+        self.changes += 1
+        
+        # Next slot starts one duration after this one, keeping a steady cadence
+        now = time.monotonic()
+        self.next_deadline = (deadline if deadline is not None else now) + self.duration
+        if self.next_deadline < now:
+            self.next_deadline = now + self.duration
+        
+        if job.photo:
+            logger.info(f"Successfully changed profile picture. Waiting {self.duration} seconds before next change.")
+        else:
+            logger.info(f"Successfully updated profile. Waiting {self.duration} seconds before next change.")
+        
+        arm_at = self.next_deadline - (self.lead_time.value if self.prearm else 0)
+        if not pushed and self.mode != "clock":
+            # Pick the next picture while idle, so a slow download can't hold up arming
+            self.current_job = self.current_job or self._next_update_job()
+            if not self.current_job.photo:
+                self._prepick(self.current_job, budget=max(0, arm_at - now))
+            now = time.monotonic()
+        
+        return max(0, arm_at - now), True
+    
+    def _retry(self):
+        """
+        Back out of a failed cycle so the next one starts from a clean pane.
+        
+        Returns:
+            tuple: Wait before retrying, which a pushed image may not cut short.
+        """
+        self.next_deadline = None
+        if self._recover():
+            self.browser.cancel_upload()
+        return 5, False
+    
+    def _recover(self):
+        """
+        Bring the browser session back after the driver died or WhatsApp Web logged out.
+        
+        Returns:
+            bool: True if the session was usable, False if it had to be recovered.
+        """
+        state = self.browser.health()
+        if state == "ok":
+            return True
+        
+        try:
+            if state == "dead":
+                logger.error("Browser session lost. Restarting the browser...")
+                self.browser.cleanup()
+                self.browser.setup()
+            else:
+                logger.error("Logged out of WhatsApp Web.")
+            
+            if not self.browser.wait_for_login(timeout=self.timeout):
+                logger.error("Login failed while recovering.")
+        except Exception as e:
+            logger.error(f"Error recovering browser session: {str(e)}")
+        return False
+    
+    def _prepick(self, job, budget):
+        """
+        Pick the picture of the next job ahead of its cycle.
+        
+        Args:
+            job (UpdateJob): The next job.
+            budget (float): Seconds that may be spent waiting for a remote image.
+        """
+        try:
+            if not self._select_photo(job, budget=budget):
+                logger.warning("No remote image could be fetched ahead of time. Trying again at the next change.")
+        except StopIteration:
+            # Reported by the cycle that finds the playlist finished
+            pass
+    
+    def _select_photo(self, job, budget=None):
+        """
+        Pick the next picture of the current mode for a job and move on.
+        
+        Args:
+            job (UpdateJob): The job to fill in.
+            budget (float, optional): Longest time in seconds to wait for remote images
+                                      in total. Defaults to the socket timeout.
+            
+        Returns:
+            bool: True if a picture was picked, False if none could be fetched.
+            
+        Raises:
+            StopIteration: When the playlist is finished.
+        """
+        if self.mode == "sequence":
+            # Get the next image in sequence
+            job.position = self.current_index
+            job.photo = self.image_files[self.current_index]
+            self.current_index = (self.current_index + 1) % len(self.image_files)
+        elif self.mode == "playlist":
+            # Get the next playlist entry
+            job.position = self.playlist.position
+            job.photo = self.playlist.next()
+        elif self.mode == "remote":
+            # Get the next remote image, normally prefetched already. Images that
+            # can't be fetched in time and have no cached copy are skipped.
+            give_up = time.monotonic() + (self.remote_source.timeout if budget is None else budget)
+            for _ in range(min(len(self.remote_source), self.prefetch + 1)):
+                index = self.current_index
+                try:
+                    job.photo = self.remote_source.get(index, timeout=max(0, give_up - time.monotonic()))
+                except FetchTimeoutError:
+                    # Still downloading, so try it again next time instead of skipping it
+                    logger.warning(f"Remote image {index} not downloaded in time")
+                    return False
+                except Exception as e:
+                    logger.warning(f"Skipping remote image {index}: {str(e) or type(e).__name__}")
+                    self.current_index = (index + 1) % len(self.remote_source)
+                    continue
+                job.position = index
+                self.current_index = (index + 1) % len(self.remote_source)
+                break
+            else:
+                return False
+        elif self.mode == "text":
+            # Get the next pre-rendered text card
+            job.position = self.current_index
+            job.photo = self.cards[self.current_index]
+            self.current_index = (self.current_index + 1) % len(self.cards)
+        return True
+    
+    def _next_update_job(self):
+        """
+        Create the update job for the next cycle, with the next about and name texts.
+        
+        The picture is picked at the start of the cycle, except for clock images,
+        which are created once the photo menu is open so they are as fresh as
+        possible when uploaded.
+        
+        Returns:
+            UpdateJob: The job for the next cycle.
+        """
+        job = UpdateJob()
+        if self.about_texts:
+            job.about = self.about_texts[self.text_index % len(self.about_texts)]
+        if self.name_texts:
+            job.name = self.name_texts[self.text_index % len(self.name_texts)]
+        self.text_index += 1
+        return job
+    
     def run(self):
         """Run the profile picture changing process."""
         try:
@@ -75,45 +732,40 @@ class ProfileChanger:
                 return
             
             # Main loop for changing profile pictures
-            current_index = 0
+            self.current_index, remaining = self._restore_state()
+            if remaining > 0:
+                logger.info(f"Honoring current slot. Waiting {remaining:.0f} seconds before next change.")
+                self.next_deadline = time.monotonic() + remaining
+                self._wait(max(0, remaining - self.lead_time.value) if self.prearm else remaining)
             
-            while True:
+            while not self.stopped:
                 try:
-                    # Open profile pane
-                    if not self.browser.open_profile_pane():
-                        logger.error("Failed to open profile pane. Retrying in 5 seconds...")
-                        time.sleep(5)
-                        continue
-                    
-                    # Check if upload option is available
-                    if not self.browser.check_for_upload_option():
-                        logger.error("Upload option not found. Retrying in 5 seconds...")
-                        time.sleep(5)
+                    # Safe point: apply commands from the control API
+                    self._apply_commands()
+                    if self.paused and not self.pending_job:
+                        self._wait(0)
                         continue
                     
-                    # Get the image to upload
-                    if self.mode == "sequence":
-                        # Get the next image in sequence
-                        image_path = self.image_files[current_index]
-                        current_index = (current_index + 1) % len(self.image_files)
-                    else:  # clock mode
-                        # Create a clock image
-                        image_path = self.image_handler.create_clock_image()
-                    
-                    # Upload the profile picture
-                    if not self.browser.upload_profile_picture(image_path):
-                        logger.error("Failed to upload profile picture. Retrying in 5 seconds...")
-                        time.sleep(5)
-                        continue
-                    
-                    logger.info(f"Successfully changed profile picture. Waiting {self.duration} seconds before next change.")
-                    time.sleep(self.duration)
-                    
+                    self.cycle += 1
+                    round_trips = self.browser.round_trips
+                    if self.profiler:
+                        wait, preempt = self.profiler.run(self.cycle, self._run_cycle)
+                    else:
+                        wait, preempt = self._run_cycle()
+                    self.round_trips = self.browser.round_trips - round_trips
+                    logger.info(f"WebDriver round trips this cycle: {self.round_trips}")
+                    self._wait(wait, preempt=preempt)
+                
                 except Exception as e:
-                    logger.error(f"Error in main loop: {str(e)}")
-                    logger.info("Retrying in 5 seconds...")
-                    time.sleep(5)
-                    
+                    logger.error(f"Error in main loop: {str(e)}. Retrying in 5 seconds...")
+                    self.next_deadline = None
+                    try:
+                        # Back out of whatever the failed cycle left armed
+                        self._retry()
+                    except Exception as e:
+                        logger.error(f"Error backing out of the failed cycle: {str(e)}")
+                    self._wait(5, preempt=False)
+        
         except KeyboardInterrupt:
             logger.info("Process interrupted by user.")
         except Exception as e:
@@ -125,6 +777,22 @@ class ProfileChanger:
         """Clean up resources."""
         logger.info("Cleaning up resources...")
         
+        # Stop control API
+        if hasattr(self, 'control_server') and self.control_server:
+            self.control_server.stop()
+        
+        # Stop prefetching remote images
+        if hasattr(self, 'remote_source') and self.remote_source:
+            self.remote_source.close()
+        
+        # Stop profiling
+        if hasattr(self, 'profiler') and self.profiler:
+            self.profiler.close()
+        
+        # Close state journal
+        if hasattr(self, 'journal') and self.journal:
+            self.journal.close()
+        
         # Clean up browser
         if hasattr(self, 'browser') and self.browser:
             self.browser.cleanup()
@@ -0,0 +1,110 @@
+"""
+Profiling module for WhatsApp Profile Changer.
+
+Wraps cycles of the main loop in cProfile, and optionally takes tracemalloc
+snapshots, to find out where the time and memory of a slow session go.
+"""
+
+import os
+import time
+import logging
+import cProfile
+import tracemalloc
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class CycleProfiler:
+    """Profiler for every N-th cycle of the main loop."""
+    
+    def __init__(self, every=1, output_dir="profiles", trace_memory=False, top=10):
+        """
+        Initialize the cycle profiler.
+        
+        Args:
+            every (int): Profile every N-th cycle.
+            output_dir (str): Folder for the .prof files and memory reports.
+            trace_memory (bool): Whether to take tracemalloc snapshots and diff them between cycles.
+            top (int): Number of entries to log from each report.
+        """
+        self.every = max(1, every)
+        self.output_dir = output_dir
+        self.trace_memory = trace_memory
+        self.top = top
+        self.snapshot = None
+        
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        
+        if trace_memory:
+            tracemalloc.start()
+            self.snapshot = self._take_snapshot()
+        
+        logger.info(f"Profiling every {self.every} cycle(s) into {output_dir}")
+    
+    def run(self, cycle, func):
+        """
+        Run one cycle, profiling it if it is due.
+        
+        Args:
+            cycle (int): Cycle number, starting at 1.
+            func (callable): The cycle to run.
+        
+        Returns:
+            The return value of func.
+        """
+        if cycle % self.every:
+            return func()
+        
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            return profiler.runcall(func)
+        finally:
+            elapsed = time.perf_counter() - start
+            path = os.path.join(self.output_dir, f"cycle-{cycle:06d}.prof")
+            profiler.dump_stats(path)
+            logger.info(f"Profiled cycle {cycle} in {elapsed:.3f}s: {path}")
+            
+            if self.trace_memory:
+                self._diff_memory(cycle)
+    
+    def _take_snapshot(self):
+        """
+        Take a tracemalloc snapshot without the allocations of tracemalloc and the import system.
+        
+        Returns:
+            Snapshot: The filtered snapshot.
+        """
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ])
+    
+    def _diff_memory(self, cycle):
+        """
+        Compare memory use with the previous snapshot.
+        
+        Args:
+            cycle (int): Cycle number.
+        """
+        snapshot = self._take_snapshot()
+        diff = snapshot.compare_to(self.snapshot, 'lineno')
+        self.snapshot = snapshot
+        
+        current, peak = tracemalloc.get_traced_memory()
+        path = os.path.join(self.output_dir, f"cycle-{cycle:06d}.mem.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"Traced memory: {current / 1024:.1f} KiB (peak {peak / 1024:.1f} KiB)\n")
+            for stat in diff:
+                f.write(f"{stat}\n")
+        
+        logger.info(f"Memory after cycle {cycle}: {current / 1024:.1f} KiB traced, diff written to {path}")
+        for stat in diff[:self.top]:
+            if stat.size_diff:
+                logger.info(f"  {stat}")
+    
+    def close(self):
+        """Stop memory tracing."""
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
\ No newline at end of file
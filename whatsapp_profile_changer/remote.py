@@ -0,0 +1,490 @@
+"""
+Remote image source module for WhatsApp Profile Changer.
+
+Pulls profile pictures from an HTTP manifest: a JSON list of image URLs (or an
+object with an "images" list), or a text file with one URL per line. Relative
+URLs are resolved against the manifest URL.
+
+Requests go over pooled keep-alive connections, and cached images are
+revalidated with conditional GETs (ETag / Last-Modified), so an unchanged image
+costs a 304 and no download. The next few images are prefetched concurrently
+into the local cache, which keeps the network off the upload critical path.
+
+A local stand-in server serves a folder the same way, for trying it out without
+a real endpoint:
+
+    python -m whatsapp_profile_changer.remote --serve pics
+    python -m whatsapp_profile_changer.remote pics
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+import threading
+import http.client
+import socketserver
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from urllib.parse import urlsplit, urljoin, quote, unquote
+from .logging_setup import setup_logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp')
+
+class ConnectionPool:
+    """Pool of keep-alive HTTP connections, per host."""
+    
+    def __init__(self, size=4, timeout=10):
+        """
+        Initialize the connection pool.
+        
+        Args:
+            size (int): Idle connections kept open per host.
+            timeout (float): Socket timeout in seconds.
+        """
+        self.size = size
+        self.timeout = timeout
+        self.idle = {}
+        self.lock = threading.Lock()
+        self.opened = 0
+        self.requests = 0
+    
+    def _acquire(self, scheme, netloc):
+        """
+        Take an idle connection to a host, or open a new one.
+        
+        Returns:
+            tuple: (connection, whether it was reused).
+        """
+        with self.lock:
+            connections = self.idle.get((scheme, netloc))
+            if connections:
+                return connections.pop(), True
+            self.opened += 1
+        
+        if scheme == 'https':
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout), False
+        return http.client.HTTPConnection(netloc, timeout=self.timeout), False
+    
+    def _release(self, scheme, netloc, connection):
+        """Return a connection to the pool, closing it if the pool is full."""
+        with self.lock:
+            connections = self.idle.setdefault((scheme, netloc), [])
+            if len(connections) < self.size:
+                connections.append(connection)
+                return
+        connection.close()
+    
+    def get(self, url, headers=None):
+        """
+        Send a GET request.
+        
+        A reused connection may have been closed by the server in the meantime,
+        so a request that fails on one is retried on another connection.
+        
+        Args:
+            url (str): URL to get.
+            headers (dict, optional): Request headers.
+        
+        Returns:
+            tuple: (status code, response headers, body bytes).
+        """
+        parts = urlsplit(url)
+        path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        while True:
+            connection, reused = self._acquire(parts.scheme, parts.netloc)
+            try:
+                connection.request('GET', path, headers=headers or {})
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if reused:
+                    continue
+                raise
+            
+            with self.lock:
+                self.requests += 1
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(parts.scheme, parts.netloc, connection)
+            return response.status, response.headers, body
+    
+    def close(self):
+        """Close all idle connections."""
+        with self.lock:
+            idle, self.idle = self.idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+class RemoteImageSource:
+    """Images from an HTTP manifest, cached locally and prefetched ahead of use."""
+    
+    def __init__(self, url, cache_folder="remote_cache", prefetch=3, workers=3, timeout=10):
+        """
+        Initialize the remote image source.
+        
+        Args:
+            url (str): URL of the manifest.
+            cache_folder (str): Folder for downloaded images.
+            prefetch (int): Number of images to fetch ahead of the current one.
+            workers (int): Number of concurrent downloads.
+            timeout (float): Socket timeout in seconds.
+        """
+        self.url = url
+        self.cache_folder = cache_folder
+        self.prefetch_count = prefetch
+        self.timeout = timeout
+        self.pool = ConnectionPool(size=workers, timeout=timeout)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self.urls = []
+        self.futures = {}
+        self.lock = threading.Lock()
+        self.not_modified = 0
+        self.downloaded = 0
+        
+        os.makedirs(cache_folder, exist_ok=True)
+        self.index_path = os.path.join(cache_folder, "index.json")
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+    
+    def __len__(self):
+        """Number of images in the manifest."""
+        return len(self.urls)
+    
+    def load(self):
+        """
+        Fetch the manifest.
+        
+        Returns:
+            list: Image URLs.
+        """
+        path = self.fetch(self.url)
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        
+        try:
+            entries = json.loads(text)
+            if isinstance(entries, dict):
+                entries = entries.get('images', [])
+        except ValueError:
+            entries = [line.strip() for line in text.splitlines() if line.strip() and not line.startswith('#')]
+        
+        urls = [urljoin(self.url, entry) for entry in entries if isinstance(entry, str)]
+        if not urls:
+            logger.error(f"No images found in manifest '{self.url}'.")
+            raise FileNotFoundError(f"No images found in manifest '{self.url}'.")
+        
+        self.urls = urls
+        logger.info(f"Found {len(urls)} images in the manifest.")
+        return urls
+    
+    def fetch(self, url):
+        """
+        Download a URL into the cache, revalidating a cached copy with a conditional GET.
+        
+        Args:
+            url (str): URL to fetch.
+        
+        Returns:
+            str: Path to the cached file.
+        """
+        with self.lock:
+            cached = self.index.get(url)
+        
+        headers = {}
+        if cached and os.path.exists(cached['file']):
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        
+        status, response_headers, body = self.pool.get(url, headers)
+        if status == 304 and headers:
+            with self.lock:
+                self.not_modified += 1
+            return cached['file']
+        if status != 200:
+            raise IOError(f"GET {url} returned {status}")
+        
+        # Write to a temporary file first so a half-written image is never used
+        extension = os.path.splitext(urlsplit(url).path)[1].lower()
+        filename = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16] + extension
+        path = os.path.abspath(os.path.join(self.cache_folder, filename))
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(body)
+        os.replace(temp_path, path)
+        
+        with self.lock:
+            self.downloaded += 1
+            self.index[url] = {
+                'file': path,
+                'etag': response_headers.get('ETag'),
+                'last_modified': response_headers.get('Last-Modified')
+            }
+            self._save_index()
+        return path
+    
+    def _save_index(self):
+        """Atomically write the cache index. Called with the lock held."""
+        temp_path = self.index_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f)
+        os.replace(temp_path, self.index_path)
+    
+    def prefetch(self, index):
+        """
+        Start fetching the image at an index and the ones after it.
+        
+        Args:
+            index (int): Index of the next image to be used.
+        """
+        with self.lock:
+            for offset in range(min(self.prefetch_count + 1, len(self.urls))):
+                url = self.urls[(index + offset) % len(self.urls)]
+                if url not in self.futures:
+                    self.futures[url] = self.executor.submit(self.fetch, url)
+    
+    def get(self, index, timeout=None):
+        """
+        Get the local path of an image, and prefetch the ones after it.
+        
+        The image is normally in the cache already. If its fetch failed, the
+        previously cached copy is used when there is one, and while a fetch is
+        still running that copy is used right away instead of waiting for it.
+        
+        Args:
+            index (int): Index of the image in the manifest.
+            timeout (float, optional): Longest time to wait for a fetch still in progress
+                                       when there is no cached copy.
+        
+        Returns:
+            str: Path to the cached image.
+        
+        Raises:
+            Exception: The fetch error, or TimeoutError, when there is no cached copy.
+        """
+        url = self.urls[index % len(self.urls)]
+        self.prefetch(index)
+        with self.lock:
+            future = self.futures.pop(url)
+            cached = self.index.get(url)
+        if cached and not future.done() and os.path.exists(cached['file']):
+            # Don't wait on the network when there is a copy to fall back to
+            timeout = 0
+        
+        try:
+            path = future.result(timeout=timeout)
+        except Exception as e:
+            with self.lock:
+                if not future.done():
+                    # Let the slow fetch finish in the background for the next pass
+                    self.futures.setdefault(url, future)
+                cached = self.index.get(url)
+            if not cached or not os.path.exists(cached['file']):
+                raise
+            logger.warning(f"Using cached copy of {url}: {str(e) or type(e).__name__}")
+            path = cached['file']
+        
+        # Fetch the following images while this one is shown
+        self.prefetch(index + 1)
+        return path
+    
+    def stats(self):
+        """
+        Get fetch counters.
+        
+        Returns:
+            dict: Requests sent, connections opened, downloads and 304 responses.
+        """
+        return {
+            'requests': self.pool.requests,
+            'connections': self.pool.opened,
+            'downloaded': self.downloaded,
+            'not_modified': self.not_modified
+        }
+    
+    def close(self):
+        """Stop prefetching and close the connections."""
+        with self.lock:
+            futures, self.futures = self.futures, {}
+        for future in futures.values():
+            future.cancel()
+        self.executor.shutdown(wait=True)
+        self.pool.close()
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    """HTTP server that handles each connection in its own thread."""
+    
+    daemon_threads = True
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Request handler of the stand-in server."""
+    
+    protocol_version = "HTTP/1.1"
+    
+    def setup(self):
+        """Count each new connection."""
+        super().setup()
+        self.server.connections += 1
+    
+    def do_GET(self):
+        """Serve the manifest or an image, answering conditional GETs with 304."""
+        self.server.requests += 1
+        folder = self.server.folder
+        name = unquote(urlsplit(self.path).path.lstrip('/'))
+        
+        if name == "manifest.json":
+            images = sorted(f for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTENSIONS))
+            body = json.dumps([quote(image) for image in images]).encode('utf-8')
+            content_type = "application/json"
+        else:
+            path = os.path.join(folder, os.path.basename(name))
+            if not name or not os.path.isfile(path):
+                self.send_error(404)
+                return
+            with open(path, 'rb') as f:
+                body = f.read()
+            content_type = "application/octet-stream"
+        
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', formatdate(usegmt=True))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        """Log requests at debug level only."""
+        logger.debug(format % args)
+
+class StandInServer:
+    """Local HTTP server that serves a folder of images and its manifest."""
+    
+    def __init__(self, folder, host="127.0.0.1", port=0, delay=0):
+        """
+        Initialize the stand-in server.
+        
+        Args:
+            folder (str): Folder of images to serve.
+            host (str): Address to listen on.
+            port (int): Port to listen on, 0 picks a free one.
+            delay (float): Seconds added to every response, to simulate network latency.
+        """
+        self.server = ThreadingHTTPServer((host, port), StandInHandler)
+        self.server.folder = folder
+        self.server.delay = delay
+        self.server.connections = 0
+        self.server.requests = 0
+        self.thread = None
+    
+    @property
+    def url(self):
+        """URL of the manifest."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/manifest.json"
+    
+    def start(self):
+        """Start serving in a background thread."""
+        self.thread = threading.Thread(target=self.server.serve_forever, name="stand-in", daemon=True)
+        self.thread.start()
+        logger.info(f"Stand-in server for '{self.server.folder}' at {self.url}")
+    
+    def stop(self):
+        """Stop serving."""
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread:
+            self.thread.join(timeout=5)
+
+def run_demo(folder, cache_folder, cycles, delay, prefetch):
+    """
+    Fetch images from a stand-in server like the profile changer would.
+    
+    Args:
+        folder (str): Folder of images to serve.
+        cache_folder (str): Folder for the local cache.
+        cycles (int): Number of images to get.
+        delay (float): Simulated network latency in seconds.
+        prefetch (int): Number of images to fetch ahead.
+    
+    Returns:
+        dict: Fetch counters and the slowest wait for an image.
+    """
+    server = StandInServer(folder, delay=delay)
+    server.start()
+    source = RemoteImageSource(server.url, cache_folder=cache_folder, prefetch=prefetch)
+    try:
+        source.load()
+        source.prefetch(0)
+        slowest = 0
+        for index in range(cycles):
+            # Leave time for the prefetch, as a picture's duration would
+            time.sleep(delay * 2)
+            start = time.monotonic()
+            source.get(index)
+            slowest = max(slowest, time.monotonic() - start)
+        result = source.stats()
+        result['slowest_wait'] = slowest
+        result['server_connections'] = server.server.connections
+        return result
+    finally:
+        source.close()
+        server.stop()
+
+def main(argv=None):
+    """Serve a folder, or fetch from a stand-in server and print the counters."""
+    parser = argparse.ArgumentParser(
+        description='Serve a folder of images over HTTP, or try the remote image source against it.'
+    )
+    parser.add_argument('folder', help='Folder of images to serve')
+    parser.add_argument('--serve', action='store_true', help='Only serve the folder until interrupted')
+    parser.add_argument('--port', type=int, default=0, help='Port to serve on (0 picks a free one)')
+    parser.add_argument('--delay', type=float, default=0.2, help='Simulated network latency in seconds')
+    parser.add_argument('--cycles', type=int, default=10, help='Number of images to get')
+    parser.add_argument('--prefetch', type=int, default=3, help='Number of images to fetch ahead')
+    parser.add_argument('--cache-folder', default='remote_cache', help='Folder for the local cache')
+    args = parser.parse_args(argv)
+    
+    if args.serve:
+        server = StandInServer(args.folder, port=args.port, delay=args.delay)
+        server.start()
+        try:
+            server.thread.join()
+        except KeyboardInterrupt:
+            server.stop()
+        return 0
+    
+    result = run_demo(args.folder, args.cache_folder, args.cycles, args.delay, args.prefetch)
+    print(f"requests: {result['requests']}, connections: {result['connections']} "
+          f"(server saw {result['server_connections']}), downloaded: {result['downloaded']}, "
+          f"not modified: {result['not_modified']}, slowest wait: {result['slowest_wait'] * 1000:.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    setup_logging()
+    sys.exit(main())
\ No newline at end of file
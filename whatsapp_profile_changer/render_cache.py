@@ -0,0 +1,196 @@
+"""
+Render cache module for WhatsApp Profile Changer.
+
+A content-addressed cache directory shared by all sessions on one host. Every
+rendered clock frame and normalized picture is stored under a key describing
+its content, so it is rendered once and then reused by every session that
+needs it.
+
+Writers publish atomically: the file is rendered to a temporary name and moved
+into place with os.replace, so readers never see a half-written image. An
+O_EXCL lock file next to it makes sure only one process renders a key while
+the others wait for the result.
+
+Every few hundred publishes the publishing process prunes files nobody has
+used for a while, so the folder stays bounded even without the render service.
+"""
+
+import os
+import time
+import logging
+import threading
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class RenderCache:
+    """Content-addressed cache directory with atomic publishing."""
+    
+    def __init__(self, cache_dir, lock_timeout=30.0, wait_timeout=5.0, prune_every=256,
+                 clock_max_age=600, max_age=86400):
+        """
+        Initialize the render cache.
+        
+        Args:
+            cache_dir (str): Shared cache directory. A memory-backed folder like
+                             /dev/shm keeps it off the disk.
+            lock_timeout (float): Age in seconds after which a lock is considered
+                                  left behind by a crashed process.
+            wait_timeout (float): Longest time to wait for another process to
+                                  finish rendering before rendering it here.
+            prune_every (int): Prune after this many publishes by this process.
+                               0 leaves pruning to the caller.
+            clock_max_age (float): Age in seconds after which unused clock frames are pruned.
+            max_age (float): Age in seconds after which any other unused file is pruned.
+        """
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.prune_every = prune_every
+        self.clock_max_age = clock_max_age
+        self.max_age = max_age
+        self.hits = 0
+        self.renders = 0
+        self.waits = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def path_for(self, key):
+        """
+        Get the path a key is stored at.
+        
+        Args:
+            key (str): Cache key, a file name describing the content.
+        
+        Returns:
+            str: Path in the cache directory.
+        """
+        return os.path.join(self.cache_dir, key)
+    
+    def get(self, key):
+        """
+        Look up a key.
+        
+        Args:
+            key (str): Cache key.
+        
+        Returns:
+            str: Path to the cached file, or None if it isn't there.
+        """
+        path = self.path_for(key)
+        return path if os.path.exists(path) else None
+    
+    def fetch(self, key, render):
+        """
+        Get a key, rendering and publishing it if no process has yet.
+        
+        Args:
+            key (str): Cache key.
+            render (callable): Called with a temporary path to write the content to.
+        
+        Returns:
+            str: Path to the cached file.
+        """
+        path = self.path_for(key)
+        try:
+            # Touch it so prune doesn't remove a file that is still in use
+            os.utime(path)
+            self.hits += 1
+            return path
+        except FileNotFoundError:
+            pass
+        
+        lock_path = path + '.lock'
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                # Another process is rendering it, wait for the result
+                if os.path.exists(path):
+                    self.waits += 1
+                    return path
+                if self._lock_is_stale(lock_path):
+                    logger.warning(f"Removing stale render lock for {key}")
+                    try:
+                        os.unlink(lock_path)
+                    except FileNotFoundError:
+                        pass
+                    continue
+                if time.monotonic() > deadline:
+                    logger.warning(f"Timed out waiting for {key}. Rendering it here.")
+                    self._publish(path, render)
+                    return path
+                time.sleep(0.01)
+                continue
+            
+            try:
+                os.close(fd)
+                # It may have been published between the first check and taking the lock
+                if os.path.exists(path):
+                    self.hits += 1
+                else:
+                    self._publish(path, render)
+                return path
+            finally:
+                try:
+                    os.unlink(lock_path)
+                except FileNotFoundError:
+                    pass
+    
+    def _publish(self, path, render):
+        """Render to a temporary file and move it into place atomically."""
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            render(temp_path)
+            os.replace(temp_path, path)
+            self.renders += 1
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+        
+        if self.prune_every and self.renders % self.prune_every == 0:
+            # Clock frames are only needed for their own second, other files for longer
+            removed = self.prune("clock-", self.clock_max_age) + self.prune("", self.max_age)
+            if removed:
+                logger.info(f"Pruned {removed} unused files from the render cache")
+    
+    def _lock_is_stale(self, lock_path):
+        """Check whether a lock was left behind by a process that died while rendering."""
+        try:
+            return time.time() - os.path.getmtime(lock_path) > self.lock_timeout
+        except FileNotFoundError:
+            return False
+    
+    def prune(self, prefix, max_age):
+        """
+        Remove cached files with a prefix that were published longer ago than max_age.
+        
+        Args:
+            prefix (str): Key prefix, e.g. "clock-".
+            max_age (float): Age in seconds.
+        
+        Returns:
+            int: Number of files removed.
+        """
+        removed = 0
+        cutoff = time.time() - max_age
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if not entry.name.startswith(prefix) or entry.name.endswith(('.lock', '.tmp')):
+                    continue
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+    
+    def stats(self):
+        """
+        Get cache counters of this process.
+        
+        Returns:
+            dict: Hits, renders and waits for another process.
+        """
+        return {'hits': self.hits, 'renders': self.renders, 'waits': self.waits}
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""
+Render service module for WhatsApp Profile Changer.
+
+Runs next to several sessions on one host and renders their clock frames ahead
+of time into the shared render cache, so each frame is drawn once per host
+instead of once per session, and the sessions only pick up finished files.
+Frames that are no longer needed are pruned from the cache.
+
+Usage:
+    python -m whatsapp_profile_changer.render_service --cache-dir /dev/shm/whatsapp_renders
+
+Point the sessions at the same folder with render_cache_dir in config.ini or
+--render-cache on the command line.
+"""
+
+import sys
+import time
+import logging
+import argparse
+from datetime import datetime, timedelta
+import pytz
+from .logging_setup import setup_logging
+from .render_cache import RenderCache
+from .image_handler import clock_key, draw_clock
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class RenderService:
+    """Pre-renders clock frames into a shared render cache."""
+    
+    def __init__(self, cache, sizes=(256,), timezones=('Asia/Kolkata',), ahead=60, prune_after=600):
+        """
+        Initialize the render service.
+        
+        Args:
+            cache (RenderCache): Cache shared with the sessions.
+            sizes (iterable): Clock image sizes the sessions use.
+            timezones (iterable): Timezones the sessions show.
+            ahead (int): Seconds of frames to keep rendered ahead of the current time.
+            prune_after (float): Age in seconds after which clock frames are removed.
+        """
+        self.cache = cache
+        self.sizes = list(sizes)
+        self.timezones = [pytz.timezone(name) for name in timezones]
+        self.ahead = ahead
+        self.prune_after = prune_after
+        self.running = False
+    
+    def render_ahead(self, now=None):
+        """
+        Render the clock frames of the next `ahead` seconds that aren't cached yet.
+        
+        Args:
+            now (datetime, optional): Current time. Defaults to now.
+        
+        Returns:
+            int: Number of frames rendered.
+        """
+        now = now or datetime.now(pytz.utc)
+        renders = self.cache.renders
+        for offset in range(self.ahead):
+            moment = now + timedelta(seconds=offset)
+            for tz in self.timezones:
+                local = moment.astimezone(tz)
+                hour, minute, second = local.hour % 12, local.minute, local.second
+                for size in self.sizes:
+                    self.cache.fetch(
+                        clock_key(hour, minute, second, size),
+                        lambda path, h=hour, m=minute, s=second, size=size:
+                            draw_clock(h, m, s, size).save(path, format='PNG')
+                    )
+        return self.cache.renders - renders
+    
+    def run(self, interval=1.0):
+        """
+        Keep frames rendered ahead and prune old ones until stopped.
+        
+        Args:
+            interval (float): Seconds between rounds.
+        """
+        self.running = True
+        last_prune = time.monotonic()
+        logger.info(f"Render service started in {self.cache.cache_dir} "
+                    f"(sizes {self.sizes}, {len(self.timezones)} timezones, {self.ahead}s ahead)")
+        while self.running:
+            started = time.monotonic()
+            rendered = self.render_ahead()
+            if rendered:
+                logger.info(f"Rendered {rendered} clock frames in {time.monotonic() - started:.2f}s")
+            
+            if started - last_prune >= self.prune_after / 2:
+                removed = self.cache.prune("clock-", self.prune_after)
+                if removed:
+                    logger.info(f"Pruned {removed} old clock frames")
+                last_prune = started
+            
+            time.sleep(max(0, interval - (time.monotonic() - started)))
+    
+    def stop(self):
+        """Stop the service after the current round."""
+        self.running = False
+
+def main(argv=None):
+    """Run the render service from the command line."""
+    parser = argparse.ArgumentParser(
+        description='Render clock frames once for all sessions on this host.'
+    )
+    parser.add_argument('--cache-dir', required=True, help='Render cache folder shared with the sessions')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[256], help='Clock image sizes')
+    parser.add_argument('--timezones', nargs='+', default=['Asia/Kolkata'], help='Clock timezones')
+    parser.add_argument('--ahead', type=int, default=60, help='Seconds of frames to render ahead')
+    parser.add_argument('--prune-after', type=float, default=600,
+                        help='Remove clock frames published longer ago than this many seconds')
+    args = parser.parse_args(argv)
+    
+    # Frames rendered ahead must not be pruned before they are shown
+    prune_after = max(args.prune_after, args.ahead * 2)
+    cache = RenderCache(args.cache_dir, clock_max_age=prune_after)
+    service = RenderService(cache, sizes=args.sizes, timezones=args.timezones,
+                            ahead=args.ahead, prune_after=prune_after)
+    try:
+        service.run()
+    except KeyboardInterrupt:
+        logger.info("Render service stopped.")
+    return 0
+
+if __name__ == "__main__":
+    setup_logging()
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Scheduler module for WhatsApp Profile Changer.
+
+Learns how long it takes to get the photo menu ready for an upload, so that
+navigation can start early enough for the new picture to go up right when its
+slot begins.
+"""
+
+import statistics
+from collections import deque
+
+class LeadTimeEstimator:
+    """Estimate of how long before a deadline navigation should start."""
+    
+    def __init__(self, initial=3.0, window=10, margin=1.2, padding=0.25):
+        """
+        Initialize the lead time estimator.
+        
+        Args:
+            initial (float): Lead time in seconds to use before anything has been measured.
+            window (int): Number of recent arming times to learn from.
+            margin (float): Factor applied to the slowest recent arming time.
+            padding (float): Seconds added on top.
+        """
+        self.initial = initial
+        self.margin = margin
+        self.padding = padding
+        self.samples = deque(maxlen=window)
+    
+    def record(self, seconds):
+        """
+        Record how long arming took.
+        
+        Args:
+            seconds (float): Arming time in seconds.
+        """
+        self.samples.append(seconds)
+    
+    @property
+    def value(self):
+        """
+        Get the current lead time.
+        
+        Returns:
+            float: Lead time in seconds.
+        """
+        if not self.samples:
+            return self.initial
+        return max(self.samples) * self.margin + self.padding
+
+class LatencyStats:
+    """Rolling statistics of deadline-to-save latency, from the slot start to the save click."""
+    
+    def __init__(self, window=100):
+        """
+        Initialize the latency statistics.
+        
+        Args:
+            window (int): Number of recent changes to keep.
+        """
+        self.samples = deque(maxlen=window)
+    
+    def record(self, seconds):
+        """
+        Record the latency of one change.
+        
+        Args:
+            seconds (float): Time from the deadline to the save click.
+        """
+        self.samples.append(seconds)
+    
+    def summary(self):
+        """
+        Summarize the recent latencies.
+        
+        Returns:
+            dict: Last, mean and 95th percentile latency in seconds, or None values if nothing was recorded.
+        """
+        if not self.samples:
+            return {'last': None, 'mean': None, 'p95': None}
+        
+        ordered = sorted(self.samples)
+        return {
+            'last': self.samples[-1],
+            'mean': statistics.mean(ordered),
+            'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        }
\ No newline at end of file